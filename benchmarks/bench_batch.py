@@ -0,0 +1,32 @@
+"""Бенчмарк BatchSnakeEnv: шаги игр в секунду при разном размере батча.
+
+Запуск: python benchmarks/bench_batch.py
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from snake_batch import BatchSnakeEnv  # noqa: E402
+
+BATCH_SIZES = (1_000, 10_000, 100_000)
+STEPS = 200
+
+
+def main():
+    """Печатает скорость в шагах игр в секунду для каждого размера батча."""
+    for n in BATCH_SIZES:
+        env = BatchSnakeEnv(n, seed=0)
+        actions = np.random.default_rng(0).integers(-1, 4, size=(STEPS, n))
+        start = perf_counter()
+        for step_actions in actions:
+            env.step(step_actions)
+        seconds = perf_counter() - start
+        print(f'n={n:>7}  game steps/s={n * STEPS / seconds:>14,.0f}')
+
+
+if __name__ == '__main__':
+    main()
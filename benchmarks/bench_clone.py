@@ -0,0 +1,49 @@
+"""Бенчмарк клонирования состояния для поиска: клонов в секунду
+у CompactState и у copy.deepcopy(GameEngine), а также пар apply/undo.
+
+Запуск: python benchmarks/bench_clone.py
+"""
+import sys
+from copy import deepcopy
+from pathlib import Path
+from timeit import Timer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from snake_state import CompactState  # noqa: E402
+from suite import make_snake  # noqa: E402
+from the_snake import UP, GameEngine  # noqa: E402
+
+LENGTHS = (1, 64, 512)
+
+
+def per_second(operation):
+    """Возвращает число операций в секунду (лучший из повторов)"""
+    timer = Timer(operation)
+    number, _ = timer.autorange()
+    return number / min(timer.repeat(repeat=3, number=number))
+
+
+def apply_undo(state):
+    """Ход и его отмена"""
+    state.apply(UP)
+    state.undo()
+
+
+def main():
+    """Печатает скорость клонирования для змеек разной длины."""
+    for length in LENGTHS:
+        engine = GameEngine(seed=0)
+        engine.snake = make_snake(length)
+        engine.snake.rng = engine.rng
+        state = CompactState.from_engine(engine)
+        print(
+            f'length={length:<4} '
+            f'clone/s={per_second(state.clone):>12,.0f}  '
+            f'deepcopy/s={per_second(lambda: deepcopy(engine)):>10,.0f}  '
+            f'apply+undo/s={per_second(lambda: apply_undo(state)):>12,.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
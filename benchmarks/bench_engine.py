@@ -0,0 +1,33 @@
+"""Бенчмарк headless-движка: шаги GameEngine.step в секунду.
+
+Запуск: python benchmarks/bench_engine.py
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from the_snake import DOWN, LEFT, RIGHT, UP, GameEngine  # noqa: E402
+
+STEPS = 200_000
+ACTIONS = (UP, RIGHT, DOWN, LEFT, None, None, None, None)
+
+
+def main():
+    """Прогоняет STEPS шагов со случайными действиями и печатает скорость."""
+    engine = GameEngine(seed=0)
+    rng = engine.rng
+    games = 1
+    start = perf_counter()
+    for _ in range(STEPS):
+        _, _, done = engine.step(rng.choice(ACTIONS))
+        if done:
+            engine.reset()
+            games += 1
+    seconds = perf_counter() - start
+    print(f'steps/s={STEPS / seconds:,.0f}  games={games}')
+
+
+if __name__ == '__main__':
+    main()
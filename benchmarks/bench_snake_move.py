@@ -0,0 +1,73 @@
+"""Микробенчмарк: тики в секунду для Snake.move и проверки столкновения.
+
+Запуск: python benchmarks/bench_snake_move.py
+Число тиков в секунду не должно падать с ростом длины змейки.
+"""
+import os
+import sys
+from itertools import count
+from pathlib import Path
+from timeit import timeit
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import the_snake  # noqa: E402
+
+LENGTHS = (10, 100, 1_000, 10_000, 100_000)
+TICKS = 20_000
+# Поле, на котором самая длинная змейка из LENGTHS проходит TICKS ходов,
+# не пересекая себя
+BOARD = the_snake.Board(512, 512)
+
+
+def serpentine(board=BOARD):
+    """
+    Бесконечно перебирает направления обхода поля "змейкой" по строкам
+    в чередующихся направлениях. Путь не пересекает себя на протяжении
+    board.size ходов.
+    """
+    row_step = the_snake.RIGHT
+    for i in count(1):
+        if i % board.width == 0:
+            row_step = (-row_step[0], 0)
+            yield the_snake.DOWN
+        else:
+            yield row_step
+
+
+def make_snake(length, steps, board=BOARD):
+    """
+    Создает змейку заданной длины, уложенную по обходу steps,
+    чтобы сегменты не пересекались.
+    """
+    snake = the_snake.Snake(board=board)
+    snake.length = length
+    for _ in range(1, length):
+        snake.direction = next(steps)
+        snake.move()
+    return snake
+
+
+def tick(snake, steps):
+    """
+    Один игровой тик без отрисовки: поворот по обходу, движение
+    и проверка столкновения. Голова все время идет по свободным клеткам.
+    """
+    snake.direction = next(steps)
+    snake.move()
+    if snake.collided:
+        raise RuntimeError('Змейка бенчмарка столкнулась с собой')
+
+
+def main():
+    """Печатает число тиков в секунду для каждой длины змейки."""
+    for length in LENGTHS:
+        steps = serpentine()
+        snake = make_snake(length, steps)
+        seconds = timeit(lambda: tick(snake, steps), number=TICKS)
+        print(f'length={length:>7}  ticks/s={TICKS / seconds:>12,.0f}')
+
+
+if __name__ == '__main__':
+    main()
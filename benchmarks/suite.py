@@ -0,0 +1,546 @@
+"""Набор бенчмарков горячих путей игры с отслеживанием регрессий.
+
+Запуск:
+    python benchmarks/suite.py                      # сравнить с baseline
+    python benchmarks/suite.py --update-baseline    # перезаписать baseline
+    python benchmarks/suite.py --threshold 0.5 --output results.json
+
+Время импорта модулей (import/<модуль>) замеряется в новом процессе
+по выводу python -X importtime.
+Результаты — время одной операции в наносекундах — пишутся в JSON и
+сравниваются с сохраненным baseline. Скорость хоста меняется от прогона
+к прогону и даже от секунды к секунде, поэтому замеры чередуются
+с эталонной нагрузкой (интерпретатор или отрисовка, см. CALIBRATIONS),
+а результаты приводятся к хосту, на котором записан baseline: время
+эталонных нагрузок на нем хранится в baseline.
+Если хотя бы один замер медленнее baseline больше чем на threshold
+или свой допуск из THRESHOLDS (и больше чем на NOISE_FLOOR нс) или
+превышает предел LIMITS, скрипт завершается с кодом 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from functools import cache
+from itertools import count
+from pathlib import Path
+from statistics import median
+from time import perf_counter_ns
+from timeit import Timer
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import the_snake  # noqa: E402
+from snake_arena import Arena  # noqa: E402
+from snake_autopilot import Autopilot  # noqa: E402
+from snake_observation import ObservedEngine  # noqa: E402
+from snake_state import CompactState  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+DEFAULT_THRESHOLD = 0.25
+# Разница с baseline меньше этой считается шумом: у операций в сотни
+# наносекунд накладные расходы цикла Timer и промахи кэша дают
+# колебания того же порядка
+NOISE_FLOOR = 1000
+# Допуски отдельных замеров, если они шире threshold. Время отрисовки
+# зависит от того, как SDL разместил поверхности в памяти, и от прогона
+# к прогону меняется на 30-50% при неизменном коде; перцентиль решения
+# определяется редкими выбросами
+THRESHOLDS = {
+    'draw': 0.75,
+    'full_draw': 0.75,
+    'tick': 0.75,
+    'viewport_draw': 0.75,
+    'autopilot_decision': 0.5,
+}
+LENGTHS = (1, 64, 512)
+REPEAT = 15
+# Зерно случайных чисел: яблоко в замерах всегда в одной клетке,
+# и время поиска пути не меняется от запуска к запуску
+SEED = 0
+# Поле, на котором идут остальные замеры
+BOARD = f'{the_snake.BOARD.width}x{the_snake.BOARD.height}'
+# Поля для замеров горячих путей: поле экрана и поле больше экрана,
+# кадр которого рисует ChunkRenderer
+BOARDS = (
+    the_snake.BOARD,
+    the_snake.Board(256, 256),
+)
+# Поля для замера отрисовки через камеру: время кадра не должно расти
+# вместе с размером поля
+VIEWPORT_BOARDS = (
+    the_snake.Board(256, 256),
+    the_snake.Board(2000, 2000),
+)
+# Число змеек в замерах арены и ее поле
+ARENA_SNAKES = (16, 256)
+ARENA_BOARD = the_snake.Board(256, 256)
+# Модули, время импорта которых отслеживается
+IMPORT_MODULES = ('the_snake', 'snake_state')
+# Длина партии Autopilot для замера задержки решения
+AUTOPILOT_TICKS = 20_000
+# Сколько ходов партии Autopilot приводится по одному замеру эталона
+DECISION_CHUNK = 500
+# Абсолютные пределы замеров в наносекундах на хосте baseline
+LIMITS = {f'autopilot_decision/board={BOARD}/p99': 1_000_000}
+
+
+def serpentine(board):
+    """
+    Бесконечно перебирает направления обхода поля по строкам
+    в чередующихся направлениях с поворотом вниз в конце строки.
+    При четной высоте поля обход с переносом через край замкнут и
+    проходит каждую клетку по разу за board.size ходов, поэтому змейка
+    короче поля, идущая по нему, никогда не сталкивается с собой
+    """
+    row_step = the_snake.RIGHT
+    for i in count(1):
+        if i % board.width == 0:
+            row_step = (-row_step[0], 0)
+            yield the_snake.DOWN
+        else:
+            yield row_step
+
+
+def make_snake(length, board=the_snake.BOARD):
+    """
+    Создает змейку длины length, уложенную по обходу serpentine
+    :return: (змейка, обход для ее следующих ходов)
+    """
+    if board.height % 2 or length >= board.size:
+        raise ValueError(
+            f'Змейка длины {length} не может обходить поле {board} '
+            'без столкновений'
+        )
+    steps = serpentine(board)
+    snake = the_snake.Snake(board=board)
+    snake.length = length
+    for _ in range(1, length):
+        snake.direction = next(steps)
+        snake.move()
+    return snake, steps
+
+
+def drive(engine, steps, length):
+    """
+    Возвращает шаг движка по обходу steps. Съеденные яблоки не удлиняют
+    змейку, чтобы длина оставалась заданной; столкновение прерывает замер
+    """
+    snake = engine.snake
+
+    def step():
+        _, _, done = engine.step(next(steps))
+        if done:
+            raise RuntimeError('Змейка замера столкнулась с собой')
+        snake.length = length
+    return step
+
+
+def frame_drawer(snake, apple, board):
+    """
+    Возвращает функцию отрисовки кадра, как в render_frame: поле
+    больше экрана рисует ChunkRenderer, остальные — Snake.draw и Apple.draw
+    """
+    if board.fits_screen():
+        return lambda: the_snake.get_screen().blits(
+            snake.draw() + apple.draw()
+        )
+    renderer = the_snake.ChunkRenderer(board)
+    return lambda: renderer.draw(snake, apple)
+
+
+def bench_snake_move(length, board):
+    """Snake.move на змейке заданной длины, идущей по свободным клеткам"""
+    snake, steps = make_snake(length, board)
+
+    def move():
+        snake.direction = next(steps)
+        snake.move()
+        if snake.collided:
+            raise RuntimeError('Змейка замера столкнулась с собой')
+    return move
+
+
+def bench_self_collision(length, board):
+    """Проверка столкновения змейки с собой из main()"""
+    snake, _ = make_snake(length, board)
+    return lambda: snake.collided
+
+
+def bench_apple_randomize(length, board):
+    """Apple.randomize_position по индексу свободных клеток"""
+    snake, _ = make_snake(length, board)
+    apple = the_snake.Apple(snake.free_cells, random.Random(SEED), board)
+    return lambda: apple.randomize_position(snake.free_cells)
+
+
+def bench_draw(length, board):
+    """Инкрементальная отрисовка кадра"""
+    snake, _ = make_snake(length, board)
+    apple = the_snake.Apple(snake.free_cells, random.Random(SEED), board)
+    draw = frame_drawer(snake, apple, board)
+    draw()
+    return draw
+
+
+def bench_full_draw(length):
+    """Полная перерисовка змейки после reset() или screen.fill"""
+    snake, _ = make_snake(length)
+    apple = the_snake.Apple(snake.free_cells, random.Random(SEED))
+
+    def draw():
+        snake.redraw = True
+        return the_snake.get_screen().blits(snake.draw() + apple.draw())
+    return draw
+
+
+def bench_autopilot(length):
+    """Решение Autopilot с поиском пути к яблоку с нуля"""
+    snake, _ = make_snake(length)
+    apple = the_snake.Apple(snake.free_cells, random.Random(SEED))
+    pilot = Autopilot()
+
+    def decide():
+        pilot.retry = 0
+        return pilot.decide(snake, apple)
+    return decide
+
+
+def bench_state_clone(length):
+    """CompactState.clone для поиска с перебором ходов"""
+    engine = the_snake.GameEngine(seed=0)
+    engine.snake, _ = make_snake(length)
+    return CompactState.from_engine(engine).clone
+
+
+def bench_state_apply_undo(length):
+    """Пара CompactState.apply и undo"""
+    engine = the_snake.GameEngine(seed=0)
+    engine.snake, _ = make_snake(length)
+    state = CompactState.from_engine(engine)
+
+    def apply_undo():
+        state.apply(the_snake.UP)
+        state.undo()
+    return apply_undo
+
+
+def bench_observed_step(length):
+    """Шаг ObservedEngine с обновлением наблюдения за O(1)"""
+    engine = ObservedEngine(seed=0)
+    engine.snake, steps = make_snake(length)
+    engine.apple.randomize_position(engine.snake.free_cells)
+    engine.rebuild()
+    return drive(engine, steps, length)
+
+
+def bench_tick(length, board):
+    """
+    Полный тик: шаг движка по свободным клеткам, отрисовка
+    и обновление экрана
+    """
+    engine = the_snake.GameEngine(seed=SEED, board=board)
+    engine.snake, steps = make_snake(length, board)
+    engine.apple.randomize_position(engine.snake.free_cells)
+    step = drive(engine, steps, length)
+    draw = frame_drawer(engine.snake, engine.apple, board)
+
+    def tick():
+        step()
+        the_snake.pg.display.update(draw())
+    return tick
+
+
+def bench_viewport_draw(length, board):
+    """
+    Кадр ChunkRenderer на большом поле: змейка сдвигается на клетку,
+    камера следует за головой, перерисовываются только измененные чанки
+    """
+    snake, steps = make_snake(length, board)
+    apple = the_snake.Apple(
+        snake.free_cells, random.Random(SEED), board
+    )
+    renderer = the_snake.ChunkRenderer(board)
+    renderer.draw(snake, apple)
+
+    def frame():
+        snake.direction = next(steps)
+        snake.move()
+        if snake.collided:
+            raise RuntimeError('Змейка замера столкнулась с собой')
+        the_snake.pg.display.update(renderer.draw(snake, apple))
+    return frame
+
+
+def bench_arena_step(snakes):
+    """Тик Arena со случайными поворотами змеек"""
+    arena = Arena(snakes, snakes // 2, seed=0, board=ARENA_BOARD)
+    choices = (the_snake.UP, the_snake.DOWN, the_snake.LEFT,
+               the_snake.RIGHT, None, None, None, None)
+    actions = [
+        [arena.rng.choice(choices) for _ in range(snakes)]
+        for _ in range(64)
+    ]
+    ticks = iter(range(1 << 62))
+    return lambda: arena.step(actions[next(ticks) % 64])
+
+
+# Замеры горячих путей на каждом поле BOARDS
+BOARD_BENCHMARKS = (
+    bench_snake_move,
+    bench_self_collision,
+    bench_apple_randomize,
+    bench_draw,
+    bench_tick,
+)
+# Замеры на поле по умолчанию
+BENCHMARKS = (
+    bench_full_draw,
+    bench_autopilot,
+    bench_state_clone,
+    bench_state_apply_undo,
+    bench_observed_step,
+)
+
+
+def measure_import(module, calibration):
+    """
+    Возвращает время импорта модуля в новом процессе в наносекундах,
+    приведенное к хосту baseline (см. measure): последняя строка
+    -X importtime — сам модуль с учетом всех его зависимостей
+    """
+    ratios = []
+    for _ in range(REPEAT):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        cumulative = result.stderr.splitlines()[-1].split('|')[1]
+        ratios.append(int(cumulative) * 1000 / reference('python'))
+    return median(ratios) * calibration['python']
+
+
+def measure_decision_p99(calibration, ticks=AUTOPILOT_TICKS, seed=0):
+    """
+    Играет партию Autopilot на поле по умолчанию и возвращает
+    99-й перцентиль времени одного решения в наносекундах, приведенный
+    к хосту baseline (см. measure): среднее скрывает редкие дорогие
+    решения, из-за которых пропускаются кадры. Партия идет отрезками
+    по DECISION_CHUNK ходов, и каждый отрезок приводится по замеру
+    эталонной нагрузки сразу после него
+    """
+    engine = the_snake.GameEngine(seed)
+    pilot = Autopilot()
+    times = []
+    for _ in range(0, ticks, DECISION_CHUNK):
+        chunk = []
+        for _ in range(DECISION_CHUNK):
+            start = perf_counter_ns()
+            action = pilot(engine)
+            chunk.append(perf_counter_ns() - start)
+            engine.step(action)
+        scale = calibration['python'] / reference('python')
+        times.extend(time * scale for time in chunk)
+    times.sort()
+    return times[len(times) * 99 // 100]
+
+
+def calibrate():
+    """
+    Эталонная нагрузка на интерпретатор, не зависящая от кода игры:
+    словарь с ключами-кортежами, арифметика и сортировка, как в горячих
+    путях
+    """
+    cells = {}
+    for i in range(512):
+        cells[i % 32, i // 32] = i
+    return sorted(cells.values(), reverse=True)
+
+
+@cache
+def calibration_blits():
+    """Спрайты двух строк клеток для calibrate_blits"""
+    sprite = the_snake.get_sprite(the_snake.SNAKE_COLOR)
+    return [
+        (sprite, the_snake.to_pixels((x, y)))
+        for y in range(2) for x in range(the_snake.BOARD.width)
+    ]
+
+
+def calibrate_blits():
+    """Эталонная нагрузка на отрисовку: пачка спрайтов в screen.blits"""
+    the_snake.get_screen().blits(calibration_blits(), doreturn=False)
+
+
+# Эталонные нагрузки и число их вызовов в одном замере. Отрисовка
+# упирается в SDL, а не в интерпретатор, поэтому приводится по своему
+# эталону
+CALIBRATIONS = {
+    'python': (calibrate, 500),
+    'blits': (calibrate_blits, 100),
+}
+# Замеры, которые приводятся по эталону blits
+DRAWING = ('draw', 'full_draw', 'tick', 'viewport_draw')
+
+
+def reference(kind):
+    """Время одного вызова эталонной нагрузки kind в наносекундах"""
+    workload, number = CALIBRATIONS[kind]
+    return Timer(workload).timeit(number) / number * 1e9
+
+
+def measure(operation, calibration, kind='python'):
+    """
+    Возвращает время одной операции в наносекундах, приведенное к хосту
+    baseline. Пачки вызовов операции чередуются с замерами эталонной
+    нагрузки kind, и медиана отношений умножается на время этой нагрузки
+    на хосте baseline: скорость хоста, меняющаяся от секунды к секунде,
+    сокращается
+    :calibration: Время эталонных нагрузок в нс на хосте baseline
+    """
+    timer = Timer(operation)
+    number, _ = timer.autorange()
+    number = max(1, number // 4)
+    ratios = [
+        timer.timeit(number) / number * 1e9 / reference(kind)
+        for _ in range(REPEAT)
+    ]
+    return median(ratios) * calibration[kind]
+
+
+def run_suite(calibration=None, lengths=LENGTHS):
+    """
+    Прогоняет все бенчмарки
+    :calibration: Время эталонных нагрузок в нс на хосте baseline;
+    None — замерить на этом хосте
+    :return: ({имя замера: нс на операцию}, calibration)
+    """
+    the_snake.pg.init()
+    the_snake.init_display()
+    if calibration is None:
+        calibration = {
+            kind: round(median(reference(kind) for _ in range(REPEAT)), 1)
+            for kind in CALIBRATIONS
+        }
+    results = {
+        f'import/{module}': round(measure_import(module, calibration))
+        for module in IMPORT_MODULES
+    }
+    for bench in BOARD_BENCHMARKS:
+        name = bench.__name__.removeprefix('bench_')
+        kind = 'blits' if name in DRAWING else 'python'
+        for board in BOARDS:
+            for length in lengths:
+                key = (f'{name}/board={board.width}x{board.height}'
+                       f'/length={length}')
+                results[key] = round(
+                    measure(bench(length, board), calibration, kind), 1
+                )
+    for bench in BENCHMARKS:
+        name = bench.__name__.removeprefix('bench_')
+        kind = 'blits' if name in DRAWING else 'python'
+        for length in lengths:
+            key = f'{name}/board={BOARD}/length={length}'
+            results[key] = round(
+                measure(bench(length), calibration, kind), 1
+            )
+    for board in VIEWPORT_BOARDS:
+        for length in lengths:
+            key = (f'viewport_draw/board={board.width}x{board.height}'
+                   f'/length={length}')
+            results[key] = round(measure(
+                bench_viewport_draw(length, board), calibration, 'blits'
+            ), 1)
+    results[f'autopilot_decision/board={BOARD}/p99'] = round(
+        measure_decision_p99(calibration)
+    )
+    for snakes in ARENA_SNAKES:
+        key = (f'arena_step/board={ARENA_BOARD.width}x{ARENA_BOARD.height}'
+               f'/snakes={snakes}')
+        results[key] = round(
+            measure(bench_arena_step(snakes), calibration), 1
+        )
+    return results, calibration
+
+
+def compare(results, baseline, threshold):
+    """
+    Сравнивает результаты с baseline. Регрессия — замер медленнее
+    baseline больше чем на допуск (threshold или более широкий допуск
+    из THRESHOLDS) и больше чем на NOISE_FLOOR нс
+    :return: список регрессий (имя, baseline, текущее значение)
+    """
+    return [
+        (key, baseline[key], value)
+        for key, value in results.items()
+        if key in baseline
+        and value > baseline[key] * (
+            1 + max(threshold, THRESHOLDS.get(key.split('/')[0], 0))
+        )
+        and value - baseline[key] > NOISE_FLOOR
+    ]
+
+
+def exceeded(results, limits=LIMITS):
+    """
+    Проверяет абсолютные пределы LIMITS
+    :return: список превышений (имя, предел, текущее значение)
+    """
+    return [
+        (key, limit, results[key])
+        for key, limit in limits.items()
+        if key in results and results[key] > limit
+    ]
+
+
+def main():
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+    calibration = None
+    if baseline and 'calibration' in baseline and not args.update_baseline:
+        calibration = baseline['calibration']
+    results, calibration = run_suite(calibration)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'calibration': calibration,
+        'results': results,
+    }
+    for key, value in results.items():
+        print(f'{key:<45} {value:>12,.1f} ns')
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n')
+        return 0
+    if baseline is None:
+        print(f'Baseline {args.baseline} не найден, сравнение пропущено')
+        return 0
+    regressions = compare(results, baseline['results'], args.threshold)
+    for key, old, new in regressions:
+        print(f'REGRESSION {key}: {old:,.1f} -> {new:,.1f} ns '
+              f'(+{new / old - 1:.0%})')
+    over = exceeded(results)
+    for key, limit, value in over:
+        print(f'LIMIT {key}: {value:,.1f} > {limit:,.1f} ns')
+    return 1 if regressions or over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
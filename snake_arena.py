@@ -0,0 +1,236 @@
+"""Арена: десятки и сотни змеек и яблок на одном поле.
+
+Все столкновения — тело с телом, голова с головой и змейки с собой —
+решаются по одной общей сетке владельцев клеток: owner[y * width + x] —
+номер змейки, занимающей клетку, или 0. Поэтому тик стоит O(число змеек),
+а не O(суммарная длина змеек). Яблоки появляются в клетках общего
+индекса FreeCells, из которого исключены и змейки, и яблоки.
+"""
+import random
+from array import array
+from itertools import repeat
+
+from the_snake import (
+    APPLE_REWARD, BOARD, DEATH_REWARD, DIRECTIONS, Apple, BoardFullError,
+    FreeCells, Snake, background_sprite, get_screen, to_pixels,
+)
+
+
+class ArenaSnake(Snake):
+    """
+    ArenaSnake — змейка арены. Ход разбит на две фазы, чтобы все змейки
+    сначала освободили хвосты, а затем заняли новые клетки головами:
+    так голова может войти в клетку, которую в этот же тик покидает
+    чужой хвост.
+    :метод: target — клетка, в которую змейка пойдет на этом тике.
+    :метод: release_tail — освобождает хвост, если змейка не растет.
+    :метод: advance — занимает клетку новой головой.
+    :метод: remove — убирает змейку с поля.
+    """
+
+    def __init__(self, arena, number, position):
+        """
+        :arena:  Арена, которой принадлежит змейка.
+        :number:  Номер змейки в сетке владельцев (с 1).
+        :alive:  Находится ли змейка на поле.
+        :next_cell:  Клетка, выбранная методом target.
+        """
+        super().__init__(arena.rng, arena.board, arena.free_cells, position)
+        self.arena = arena
+        self.number = number
+        self.alive = True
+        self.next_cell = None
+        self.direction = arena.rng.choice(DIRECTIONS)
+        arena.owner[arena.to_index(position)] = number
+
+    def target(self, action=None):
+        """
+        Применяет действие и возвращает клетку следующего хода
+        :action: Направление или None; разворот игнорируется, как
+        в GameEngine.step
+        """
+        if action is not None and (
+            action[0] + self.direction[0], action[1] + self.direction[1]
+        ) != (0, 0):
+            self.next_direction = action
+        self.update_direction()
+        head_x, head_y = self.get_head_position
+        self.next_cell = (
+            (head_x + self.direction[0]) % self.board.width,
+            (head_y + self.direction[1]) % self.board.height,
+        )
+        return self.next_cell
+
+    def release_tail(self):
+        """Освобождает клетку хвоста, если змейка не растет"""
+        self.last = None
+        if len(self.positions) >= self.length:
+            self.last = self.positions.pop()
+            del self.occupied[self.last]
+            self.arena.release(self.last)
+
+    def advance(self):
+        """Занимает клетку next_cell новой головой"""
+        cell = self.next_cell
+        self.positions.appendleft(cell)
+        self.occupied[cell] = 1
+        self.free_cells.remove(cell)
+        self.arena.owner[self.arena.to_index(cell)] = self.number
+
+    def remove(self):
+        """Убирает змейку с поля и освобождает ее клетки"""
+        for cell in self.positions:
+            self.arena.release(cell)
+            self.arena.cleared.append(cell)
+        self.positions.clear()
+        self.occupied.clear()
+        self.alive = False
+
+    def respawn(self, position):
+        """Возвращает змейку на поле длиной 1 в клетке position"""
+        self.position = position
+        self.reset()
+        self.alive = True
+        self.arena.owner[self.arena.to_index(position)] = self.number
+
+
+class Arena:
+    """
+    Arena ведет матч «все против всех». Змейка погибает, если ее голова
+    входит в клетку, занятую после ухода хвостов любым телом, если
+    в одну клетку входят несколько голов или если две головы меняются
+    клетками. Погибшие змейки сразу появляются в случайной свободной
+    клетке.
+    :метод: step — выполняет один тик всех змеек.
+    :метод: draw — отрисовывает изменения на экране.
+    """
+
+    def __init__(self, snakes=16, apples=8, seed=None, board=BOARD):
+        """
+        :rng:  Генератор случайных чисел арены.
+        :board:  Игровое поле.
+        :free_cells:  Общий индекс клеток без змеек и яблок.
+        :owner:  Сетка владельцев клеток.
+        :snakes:  Список змеек ArenaSnake.
+        :apples:  Словарь клетка -> Apple.
+        :cleared:  Клетки погибших змеек, которые нужно стереть с экрана.
+        :ticks, deaths:  Количество тиков и гибелей с начала матча.
+        """
+        self.rng = random.Random(seed)
+        self.board = board
+        self.free_cells = FreeCells(board=board)
+        self.owner = array('i', bytes(4 * board.size))
+        self.cleared = []
+        self.snakes = []
+        for number in range(1, snakes + 1):
+            self.snakes.append(ArenaSnake(
+                self, number, self.free_cells.sample(self.rng)
+            ))
+        self.apples = {}
+        for _ in range(apples):
+            apple = Apple(self.free_cells, self.rng, board)
+            self.free_cells.remove(apple.position)
+            self.apples[apple.position] = apple
+        self.ticks = 0
+        self.deaths = 0
+
+    def to_index(self, cell):
+        """Переводит координаты клетки в индекс сетки владельцев"""
+        return cell[1] * self.board.width + cell[0]
+
+    def release(self, cell):
+        """Освобождает клетку в сетке владельцев и индексе FreeCells"""
+        self.owner[self.to_index(cell)] = 0
+        self.free_cells.add(cell)
+
+    def spawn_apple(self, apple):
+        """
+        Переносит яблоко в случайную свободную клетку. Если свободных
+        клеток нет, яблоко убирается с поля.
+        """
+        self.apples.pop(apple.position, None)
+        try:
+            apple.randomize_position(self.free_cells)
+        except BoardFullError:
+            return
+        self.free_cells.remove(apple.position)
+        self.apples[apple.position] = apple
+
+    def swapped(self, moving):
+        """
+        Находит змеек, которые за тик меняются клетками голов: голова
+        каждой идет в клетку головы другой. Хвосты освобождаются до
+        хода голов, поэтому по сетке владельцев такие змейки
+        проходили бы друг сквозь друга.
+        :return: множество таких змеек
+        """
+        starts = {snake.get_head_position: snake for snake in moving}
+        result = set()
+        for snake in moving:
+            other = starts.get(snake.next_cell)
+            if (other is not None and other is not snake
+                    and other.next_cell == snake.get_head_position):
+                result.add(snake)
+        return result
+
+    def step(self, actions=None):
+        """
+        Выполняет один тик всех змеек
+        :actions: Направления змеек по порядку; None — не менять
+        :return: список наград змеек
+        """
+        moving = []
+        heads = {}
+        for snake, action in zip(self.snakes, actions or repeat(None)):
+            if snake.alive:
+                cell = snake.target(action)
+                heads[cell] = heads.get(cell, 0) + 1
+                moving.append(snake)
+        swapped = self.swapped(moving)
+        for snake in moving:
+            snake.release_tail()
+        # Голова, занявшая клетку раньше в этом цикле, не мешает следующим:
+        # в ту же клетку могла войти только столкнувшаяся голова
+        dead = []
+        rewards = [0] * len(self.snakes)
+        for snake in moving:
+            if (heads[snake.next_cell] > 1 or snake in swapped
+                    or self.owner[self.to_index(snake.next_cell)]):
+                dead.append(snake)
+                continue
+            snake.advance()
+            apple = self.apples.get(snake.next_cell)
+            if apple is not None:
+                snake.length += 1
+                rewards[snake.number - 1] = APPLE_REWARD
+                self.spawn_apple(apple)
+        for snake in dead:
+            snake.remove()
+            rewards[snake.number - 1] = DEATH_REWARD
+        self.deaths += len(dead)
+        for snake in self.snakes:
+            if not snake.alive and self.free_cells:
+                snake.respawn(self.free_cells.sample(self.rng))
+        self.ticks += 1
+        return rewards
+
+    def draw(self) -> list:
+        """
+        Отрисовывает изменения за тик: стирает клетки погибших змеек
+        и ушедшие хвосты, затем рисует змеек и яблоки
+        :return: список изменившихся областей экрана
+        """
+        background = background_sprite()
+        erased = self.cleared + [
+            snake.last for snake in self.snakes if snake.last is not None
+        ]
+        self.cleared = []
+        for snake in self.snakes:
+            snake.last = None
+        blits = [(background, to_pixels(cell)) for cell in erased]
+        for snake in self.snakes:
+            if snake.alive:
+                blits += snake.draw()
+        for apple in self.apples.values():
+            blits += apple.draw()
+        return get_screen().blits(blits)
@@ -0,0 +1,404 @@
+"""Автопилот змейки: кратчайший путь к яблоку с проверкой «догони хвост»
+и обход поля по гамильтонову циклу.
+
+Клетки поля — индексы y * width + x. Соседи клеток с переносом через край
+поля (как в Snake.move) считаются один раз и хранятся в плоском массиве:
+сосед клетки cell в направлении DIRECTIONS[code] лежит по индексу
+4 * cell + code. Буферы поиска выделяются один раз и переиспользуются:
+вместо очистки каждый поиск получает новую метку, поэтому решение стоит
+пропорционально обойденной области, а не размеру поля.
+"""
+from array import array
+from heapq import heappop, heappush
+
+from the_snake import BOARD, DIRECTIONS
+
+# Режимы автопилота
+BFS = 'bfs'
+HAMILTONIAN = 'hamiltonian'
+MODES = (BFS, HAMILTONIAN)
+
+# В режиме HAMILTONIAN срезать путь по циклу можно, пока змейка занимает
+# меньше этой доли поля
+SHORTCUT_LIMIT = 0.5
+
+# Сколько ходов режим BFS не ищет путь к яблоку заново после того, как
+# безопасного пути не нашлось: тело за это время успевает сдвинуться
+RETRY_TICKS = 8
+
+# Сколько клеток могут раскрыть все поиски одного решения BFS. Поиск,
+# исчерпавший бюджет, считается неудачным, поэтому время решения
+# не растет с длиной змейки
+SEARCH_BUDGET = 250
+
+
+def wrap_table(size):
+    """
+    Таблица расстояний по одной оси с переносом через край поля:
+    элемент с индексом разности координат d (и отрицательным тоже)
+    равен min(|d|, size - |d|)
+    """
+    return [min(d % size, -d % size) for d in range(2 * size)]
+
+
+def neighbor_table(board):
+    """
+    Строит плоскую таблицу соседей клеток поля с переносом через край
+    :return: array — сосед клетки cell в направлении DIRECTIONS[code]
+    по индексу 4 * cell + code
+    """
+    width, height = board
+    size = board.size
+    columns = {
+        (0, -1): array('i', range(size - width, size)),
+        (0, 1): array('i', range(width, size)),
+        (1, 0): array('i'),
+        (-1, 0): array('i'),
+    }
+    columns[(0, -1)].extend(range(size - width))
+    columns[(0, 1)].extend(range(width))
+    for row in range(0, size, width):
+        columns[(1, 0)].extend(range(row + 1, row + width))
+        columns[(1, 0)].append(row)
+        columns[(-1, 0)].append(row + width - 1)
+        columns[(-1, 0)].extend(range(row, row + width - 1))
+    table = array('i', bytes(4 * 4 * size))
+    for code, direction in enumerate(DIRECTIONS):
+        table[code::4] = columns[direction]
+    return table
+
+
+def hamiltonian_cycle(board):
+    """
+    Строит гамильтонов цикл поля-тора: строки обходятся «змейкой»
+    по столбцам 1..width-1, а столбец 0 служит обратным путем. При нечетной
+    высоте цикл замыкается переносом через край поля.
+    :return: список клеток в порядке обхода
+    """
+    width, height = board
+    order = []
+    for y in range(height):
+        columns = range(1, width) if y % 2 == 0 else range(width - 1, 0, -1)
+        order.extend(y * width + x for x in columns)
+    order.extend(y * width for y in range(height - 1, -1, -1))
+    return order
+
+
+class Autopilot:
+    """
+    Autopilot выбирает направление змейки вместо handle_keys.
+    В режиме BFS ищет кратчайший путь к яблоку и идет по нему, только если
+    после съедения яблока голова сможет догнать хвост; иначе идет к своему
+    хвосту. Поиск учитывает, через сколько ходов освободится каждая клетка
+    тела. Найденный путь сохраняется и используется, пока яблоко на месте.
+    В режиме HAMILTONIAN идет по гамильтонову циклу, срезая путь к яблоку,
+    пока змейка короткая, и гарантированно заполняет всё поле.
+    Экземпляр вызывается как политика snake_runner: autopilot(engine).
+    :метод: decide — направление для следующего хода змейки.
+    """
+
+    def __init__(self, board=BOARD, mode=BFS):
+        """
+        :board:  Игровое поле.
+        :mode:  Режим BFS или HAMILTONIAN.
+        :neighbors:  Плоская таблица соседей neighbor_table.
+        :busy:  Метка хода, после которого освободится клетка тела.
+        :seen, parent, heap:  Буферы поиска пути.
+        :plan:  Коды направлений сохраненного пути к яблоку, с конца.
+        :retry:  Через сколько ходов снова искать путь к яблоку.
+        :escape:  Клетки найденного пути к хвосту с конца; escape_head
+          и escape_length — голова и длина змейки, для которых он верен.
+          Ход по этому пути безопасен без нового поиска.
+        :budget:  Сколько клеток еще могут раскрыть поиски решения.
+        :column, row:  Координаты каждой клетки.
+        :wrap_x, wrap_y:  Расстояния по осям, см. wrap_table.
+        :cycle:  Позиция каждой клетки в гамильтоновом цикле.
+        :successor:  Код направления к следующей клетке цикла.
+        """
+        if mode not in MODES:
+            raise ValueError(f'Неизвестный режим автопилота: {mode}')
+        self.board = board
+        self.mode = mode
+        self.size = board.size
+        self.neighbors = neighbor_table(board)
+        self.busy = array('q', bytes(8 * self.size))
+        self.seen = array('q', bytes(8 * self.size))
+        self.parent = array('i', bytes(4 * self.size))
+        self.heap = []
+        cells = range(self.size)
+        self.column = array('i', (cell % board.width for cell in cells))
+        self.row = array('i', (cell // board.width for cell in cells))
+        self.wrap_x = wrap_table(board.width)
+        self.wrap_y = wrap_table(board.height)
+        self.base = 0
+        self.stamp = 0
+        self.plan = []
+        self.plan_head = None
+        self.plan_apple = None
+        self.retry = 0
+        self.escape = []
+        self.escape_head = None
+        self.escape_length = None
+        self.budget = SEARCH_BUDGET
+        if mode == HAMILTONIAN:
+            order = hamiltonian_cycle(board)
+            self.cycle = array('i', bytes(4 * self.size))
+            self.successor = array('b', bytes(self.size))
+            for position, cell in enumerate(order):
+                self.cycle[cell] = position
+                self.successor[cell] = self.code(
+                    cell, order[(position + 1) % self.size]
+                )
+
+    def __call__(self, engine):
+        """Политика для snake_runner и update_game"""
+        return self.decide(engine.snake, engine.apple)
+
+    def to_index(self, position):
+        """Переводит координаты клетки в индекс y * width + x"""
+        return position[1] * self.board.width + position[0]
+
+    def code(self, cell, neighbor):
+        """Возвращает код направления от клетки cell к соседней клетке"""
+        start = 4 * cell
+        return self.neighbors[start:start + 4].index(neighbor)
+
+    def decide(self, snake, apple):
+        """
+        Выбирает направление следующего хода
+        :return: UP, DOWN, LEFT, RIGHT или None — не менять направление
+        """
+        if self.mode == HAMILTONIAN:
+            return DIRECTIONS[self.cycle_move(snake, apple)]
+        head = self.to_index(snake.get_head_position)
+        target = self.to_index(apple.position)
+        if self.plan and head == self.plan_head and target == self.plan_apple:
+            code = self.plan.pop()
+        else:
+            self.plan.clear()
+            if target != self.plan_apple:
+                self.retry = 0
+            code = self.path_move(snake, head, target)
+        if code is None:
+            return None
+        self.plan_head = self.neighbors[4 * head + code]
+        self.plan_apple = target
+        return DIRECTIONS[code]
+
+    def mark_body(self, cells, growth):
+        """
+        Отмечает клетки тела (от головы к хвосту) ходом, после которого
+        они освободятся: хвост — через growth + 1 ход, голова — через
+        len(cells) + growth ходов
+        :return: база меток — клетка свободна на глубине depth поиска,
+        если busy[cell] <= база + depth
+        """
+        self.base += self.size + len(cells) + growth + 2
+        base = self.base
+        busy = self.busy
+        count = len(cells) + growth
+        for i, cell in enumerate(cells):
+            busy[cell] = base + count - i
+        return base
+
+    def search(self, start, goal, base, banned):
+        """
+        Поиск A* от start до goal по клеткам, свободным к моменту, когда
+        до них дойдет голова. Эвристика — расстояние distance, при равной
+        оценке раньше раскрываются более дальние от start клетки, поэтому
+        на открытом поле обходится почти только сам путь. Первый ход
+        в клетку banned запрещен: это разворот, который GameEngine.step
+        игнорирует.
+        Каждая раскрытая клетка тратит единицу бюджета budget.
+        :return: True, если путь найден; путь восстанавливается по parent
+        """
+        self.stamp += 1
+        stamp = self.stamp
+        seen, parent, heap = self.seen, self.parent, self.heap
+        neighbors, busy = self.neighbors, self.busy
+        column, row = self.column, self.row
+        wrap_x, wrap_y = self.wrap_x, self.wrap_y
+        goal_x, goal_y = column[goal], row[goal]
+        seen[start] = stamp
+        heap.clear()
+        heap.append((0, 0, start))
+        budget = self.budget
+        while heap and budget > 0:
+            budget -= 1
+            _, depth, cell = heappop(heap)
+            depth = 1 - depth
+            limit = base + depth
+            for neighbor in neighbors[4 * cell:4 * cell + 4]:
+                if seen[neighbor] == stamp or busy[neighbor] > limit:
+                    continue
+                if depth == 1 and neighbor == banned:
+                    continue
+                seen[neighbor] = stamp
+                parent[neighbor] = cell
+                if neighbor == goal:
+                    self.budget = budget
+                    return True
+                heappush(heap, (
+                    depth + wrap_x[column[neighbor] - goal_x]
+                    + wrap_y[row[neighbor] - goal_y],
+                    -depth, neighbor,
+                ))
+        self.budget = budget
+        return False
+
+    def trace(self, start, goal):
+        """Возвращает клетки найденного пути от goal к start без start"""
+        path = [goal]
+        parent = self.parent
+        while parent[path[-1]] != start:
+            path.append(parent[path[-1]])
+        return path
+
+    def distance(self, cell, other):
+        """Расстояние между клетками с учетом переноса через край поля"""
+        width, height = self.board
+        dx = abs(cell % width - other % width)
+        dy = abs(cell // width - other // width)
+        return min(dx, width - dx) + min(dy, height - dy)
+
+    def path_move(self, snake, head, target):
+        """
+        Ход по кратчайшему безопасному пути к яблоку. Если его нет
+        (следующая попытка — через RETRY_TICKS ходов) — ход safe_move.
+        Тело отмечается один раз, все поиски решения делят бюджет
+        SEARCH_BUDGET
+        :return: код направления или None
+        """
+        self.budget = SEARCH_BUDGET
+        width = self.board.width
+        body = [y * width + x for x, y in snake.positions]
+        banned = body[1] if len(body) > 1 else self.neighbors[
+            4 * head + (DIRECTIONS.index(snake.direction) + 2) % 4
+        ]
+        base = self.mark_body(body, snake.length - len(body))
+        if self.retry:
+            self.retry -= 1
+        elif self.search(head, target, base, banned):
+            path = self.trace(head, target)
+            escape = self.tail_path(path, body, snake.length, base)
+            if escape is not None:
+                self.keep_escape(escape, target, snake.length + 1)
+                cells = [head] + path[::-1]
+                self.plan = [
+                    self.code(cell, following)
+                    for cell, following in zip(cells[-2::-1], path)
+                ]
+                return self.plan.pop()
+            self.retry = RETRY_TICKS
+        else:
+            self.retry = RETRY_TICKS
+        return self.safe_move(snake, head, target, body, base, banned)
+
+    def safe_move(self, snake, head, target, body, base, banned):
+        """
+        Ход, после которого голова может догнать хвост, как можно дальше
+        от яблока, чтобы тело успело освободить путь. Если проверки
+        не уложились в бюджет — следующий ход сохраненного пути к хвосту
+        escape, если нет и его — в любую свободную клетку
+        :return: код направления или None
+        """
+        moves = {
+            code: neighbor
+            for code, neighbor in enumerate(
+                self.neighbors[4 * head:4 * head + 4]
+            )
+            if neighbor != banned and self.busy[neighbor] <= base + 1
+        }
+        ordered = sorted(
+            moves, key=lambda code: self.distance(moves[code], target),
+            reverse=True,
+        )
+        known = None
+        if (self.escape and self.escape_head == head
+                and self.escape_length == snake.length):
+            known = self.escape.pop()
+        self.escape_head = None
+        for code in ordered:
+            escape = self.tail_path(
+                [moves[code]], body, snake.length, base, False
+            )
+            if escape is not None:
+                self.keep_escape(escape, moves[code], snake.length)
+                return code
+        for code in ordered:
+            if moves[code] == known:
+                self.escape_head = known
+                return code
+        return ordered[0] if ordered else None
+
+    def keep_escape(self, path, head, length):
+        """Сохраняет путь к хвосту, верный для головы head и длины length"""
+        self.escape = path
+        self.escape_head = head
+        self.escape_length = length
+
+    def tail_path(self, path, body, length, base, eaten=True):
+        """
+        Ищет путь, по которому голова догонит хвост после того, как змейка
+        длины length пройдет путь path (клетки от конца пути к голове).
+        Метки тела mark_body с базой base переиспользуются со сдвигом
+        базы на len(path) ходов; клетки path отмечаются на время поиска
+        :eaten: Съедено ли в конце пути яблоко
+        :return: клетки пути к хвосту с конца или None, если путь
+        не найден в пределах бюджета
+        """
+        count = min(length, len(body) + len(path))
+        if count == 1:
+            return []
+        cells = (path + body)[:count]
+        shifted = base + len(path) - eaten
+        top = shifted + length + eaten
+        busy = self.busy
+        saved = [busy[cell] for cell in path]
+        for i, cell in enumerate(path):
+            busy[cell] = top - i
+        found = self.search(cells[0], cells[-1], shifted, cells[1])
+        for cell, value in zip(path, saved):
+            busy[cell] = value
+        return self.trace(cells[0], cells[-1]) if found else None
+
+    def cycle_move(self, snake, apple):
+        """
+        Ход по гамильтонову циклу. Пока змейка короче SHORTCUT_LIMIT поля,
+        разрешен ход вперед по циклу в обход части клеток, если он не
+        перескакивает яблоко и оставляет до хвоста запас на пропущенные
+        клетки, отложенный рост и по яблоку на каждую клетку тела,
+        которую хвост проходит, прежде чем освободить пропущенные клетки.
+        :return: код направления
+        """
+        head = self.to_index(snake.get_head_position)
+        code = self.successor[head]
+        reverse = (DIRECTIONS.index(snake.direction) + 2) % 4
+        if code == reverse:
+            # Бывает только у змейки из 1-2 клеток: порядок тела по циклу
+            # сохранится при любом ходе
+            return (reverse + 1) % 4
+        if snake.length >= SHORTCUT_LIMIT * self.size:
+            return code
+        size, cycle = self.size, self.cycle
+        position = cycle[head]
+        tail = self.to_index(snake.positions[-1])
+        body = len(snake.positions)
+        growth = snake.length - body
+        tail_distance = (cycle[tail] - position) % size or size
+        holes = size - tail_distance + 1 - body
+        # После хода на distance клеток свободных клеток до хвоста должно
+        # хватить на все пропущенные клетки (holes + distance - 1), на
+        # отложенный рост и на яблоко на каждом ходу, пока хвост проходит
+        # тело и освобождает пропущенные клетки
+        limit = min(
+            (cycle[self.to_index(apple.position)] - position) % size,
+            (tail_distance - holes - growth - body - 1) // 2,
+        )
+        best = 1
+        for option in range(4):
+            neighbor = self.neighbors[4 * head + option]
+            distance = (cycle[neighbor] - position) % size
+            if option != reverse and best < distance <= limit:
+                best, code = distance, option
+        return code
@@ -0,0 +1,165 @@
+import numpy as np
+
+from the_snake import (
+    APPLE_REWARD, DEATH_REWARD, DIRECTIONS, GRID_HEIGHT, GRID_WIDTH,
+)
+
+DIRECTION_X = np.array([direction[0] for direction in DIRECTIONS])
+DIRECTION_Y = np.array([direction[1] for direction in DIRECTIONS])
+
+# Код действия "не менять направление"
+KEEP_DIRECTION = -1
+
+# Сколько раундов случайного выбора клетки для яблока делать до перехода
+# к полному перебору свободных клеток
+SPAWN_ATTEMPTS = 8
+
+
+class BatchSnakeEnv:
+    """
+    BatchSnakeEnv продвигает n независимых игр за один векторизованный шаг.
+    Правила совпадают с Snake.move и main(): перенос через край поля,
+    поедание яблока, столкновение с собой. Клетки поля хранятся как индексы
+    y * width + x, тела змеек — в кольцевых буферах, занятость клеток —
+    в сетке (n, width * height). Завершившиеся игры перезапускаются сами.
+    :метод: reset — перезапускает все игры.
+    :метод: step — выполняет один тик во всех играх.
+    """
+
+    def __init__(self, n, width=GRID_WIDTH, height=GRID_HEIGHT, seed=None):
+        """
+        :n:  Количество игр.
+        :width, height:  Размер поля в клетках.
+        :rng:  Генератор случайных чисел numpy.
+        :heads_x, heads_y:  Координаты голов в клетках.
+        :directions:  Коды направлений из DIRECTIONS.
+        :lengths:  Длины змеек (Snake.length).
+        :counts:  Количество сегментов в теле (len(Snake.positions)).
+        :body:  Кольцевые буферы тел, head_ptr — индекс головы в буфере.
+        :grid:  Сетки занятости клеток.
+        :apples:  Клетки яблок.
+        :ticks:  Тики с начала текущей игры.
+        :final_lengths, final_ticks:  Итог последней завершенной игры.
+        """
+        self.n = n
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.center = (height // 2) * width + width // 2
+        self.rng = np.random.default_rng(seed)
+        cell_type = np.min_scalar_type(self.cells - 1)
+        self.games = np.arange(n)
+        self.heads_x = np.empty(n, dtype=np.int32)
+        self.heads_y = np.empty(n, dtype=np.int32)
+        self.directions = np.empty(n, dtype=np.int8)
+        self.lengths = np.empty(n, dtype=np.int32)
+        self.counts = np.empty(n, dtype=np.int32)
+        self.head_ptr = np.empty(n, dtype=np.int32)
+        self.body = np.empty((n, self.cells), dtype=cell_type)
+        self.grid = np.empty((n, self.cells), dtype=np.uint8)
+        self.apples = np.empty(n, dtype=np.int32)
+        self.ticks = np.empty(n, dtype=np.int64)
+        self.final_lengths = np.zeros(n, dtype=np.int32)
+        self.final_ticks = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    @property
+    def heads(self):
+        """Клетки голов всех змеек"""
+        return self.heads_y * self.width + self.heads_x
+
+    def reset(self, seed=None):
+        """
+        Перезапускает все игры
+        :seed: Зерно генератора; None — продолжить текущую последовательность
+        :return: клетки голов
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_games(self.games)
+        return self.heads
+
+    def step(self, actions=None):
+        """
+        Выполняет один тик во всех играх
+        :actions: Массив кодов направлений из DIRECTIONS или KEEP_DIRECTION;
+        None — все змейки продолжают движение. Разворот игнорируется.
+        :return: (клетки голов, награды, признаки завершения игры)
+        """
+        games = self.games
+        if actions is not None:
+            actions = np.asarray(actions)
+            valid = (actions >= 0) & (actions != (self.directions + 2) % 4)
+            self.directions = np.where(
+                valid, actions, self.directions
+            ).astype(np.int8)
+        self.heads_x = (self.heads_x + DIRECTION_X[self.directions]) % (
+            self.width
+        )
+        self.heads_y = (self.heads_y + DIRECTION_Y[self.directions]) % (
+            self.height
+        )
+        heads = self.heads
+        # Хвост уходит до проверки столкновения, как в Snake.move
+        pop = self.counts >= self.lengths
+        popped = games[pop]
+        tail_ptr = (self.head_ptr[pop] - self.counts[pop] + 1) % self.cells
+        self.grid[popped, self.body[popped, tail_ptr]] -= 1
+        self.counts += ~pop
+        collided = self.grid[games, heads] > 0
+        self.head_ptr = (self.head_ptr + 1) % self.cells
+        self.body[games, self.head_ptr] = heads
+        self.grid[games, heads] += 1
+        self.ticks += 1
+
+        eaten = heads == self.apples
+        board_full = np.zeros(self.n, dtype=bool)
+        board_full[self._spawn_apples(games[eaten])] = True
+        # Как и в GameEngine.step, на заполненном поле расти некуда
+        self.lengths += eaten & ~board_full
+        rewards = np.where(
+            eaten, APPLE_REWARD, np.where(collided, DEATH_REWARD, 0)
+        )
+        dones = board_full | (collided & ~eaten)
+        finished = games[dones]
+        if finished.size:
+            self.final_lengths[finished] = self.lengths[finished]
+            self.final_ticks[finished] = self.ticks[finished]
+            self._reset_games(finished)
+        return heads, rewards, dones
+
+    def _reset_games(self, games):
+        """Возвращает змейки игр games к начальному состоянию"""
+        self.grid[games] = 0
+        self.heads_x[games] = self.width // 2
+        self.heads_y[games] = self.height // 2
+        self.directions[games] = self.rng.integers(0, 4, size=games.size)
+        self.lengths[games] = 1
+        self.counts[games] = 1
+        self.head_ptr[games] = 0
+        self.body[games, 0] = self.center
+        self.grid[games, self.center] = 1
+        self.ticks[games] = 0
+        self._spawn_apples(games)
+
+    def _spawn_apples(self, games):
+        """
+        Ставит яблоки игр games в случайные свободные клетки.
+        Сначала клетки выбираются случайно с отбраковкой занятых, затем
+        для оставшихся игр — среди всех свободных клеток сразу.
+        :return: игры, в которых свободных клеток не осталось
+        """
+        for _ in range(SPAWN_ATTEMPTS):
+            if not games.size:
+                return games
+            cells = self.rng.integers(0, self.cells, size=games.size)
+            free = self.grid[games, cells] == 0
+            self.apples[games[free]] = cells[free]
+            games = games[~free]
+        if not games.size:
+            return games
+        keys = self.rng.random((games.size, self.cells))
+        keys[self.grid[games] > 0] = -1
+        cells = keys.argmax(axis=1)
+        self.apples[games] = cells
+        return games[keys[np.arange(games.size), cells] < 0]
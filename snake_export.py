@@ -0,0 +1,164 @@
+"""Экспорт кадров игры в файлы без окна: для роликов из записей игр.
+
+Кадр снимается с экрана после обычной отрисовки Snake.draw/Apple.draw
+(pg.image.tobytes), кладется в ограниченную очередь и записывается на
+диск отдельным потоком. Игровой цикл ждет диск, только если очередь
+заполнена.
+
+Форматы:
+    RAW — один файл с кадрами RGB24 подряд, например для
+        ffmpeg -f rawvideo -pix_fmt rgb24 -s 640x480 -r 20 -i game.rgb;
+    PNG — последовательность файлов frame_000000.png в каталоге.
+Запуск: python snake_export.py game.snkr game.rgb --count 2000
+"""
+import argparse
+import os
+import threading
+from pathlib import Path
+from queue import Queue
+
+from snake_replay import ReplayPlayer
+from the_snake import (
+    BOARD_BACKGROUND_COLOR, ChunkRenderer, get_screen, init_display, pg,
+)
+
+RAW = 'raw'
+PNG = 'png'
+FORMATS = (RAW, PNG)
+
+# Сколько кадров может ждать записи
+QUEUE_SIZE = 64
+# Метка конца очереди кадров
+_STOP = None
+
+
+class FrameWriter:
+    """
+    FrameWriter записывает кадры в фоновом потоке.
+    :метод: put — снимает кадр с поверхности и ставит его в очередь.
+    :метод: close — дожидается записи всех кадров.
+    """
+
+    def __init__(self, path, fmt=RAW, queue_size=QUEUE_SIZE):
+        """
+        :path:  Файл (RAW) или каталог (PNG) для кадров.
+        :fmt:  Формат RAW или PNG.
+        :queue:  Очередь кадров (bytes, размер) не длиннее queue_size.
+        :frames:  Количество принятых кадров.
+        :error:  Исключение потока записи.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f'Неизвестный формат кадров: {fmt}')
+        self.path = Path(path)
+        self.fmt = fmt
+        self.queue = Queue(maxsize=queue_size)
+        self.frames = 0
+        self.error = None
+        if fmt == PNG:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        """Позволяет использовать FrameWriter в конструкции with"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Дожидается записи кадров при выходе из with"""
+        self.close()
+
+    def put(self, surface):
+        """
+        Копирует содержимое surface и ставит кадр в очередь. Блокируется,
+        только если очередь заполнена.
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put(
+            (pg.image.tobytes(surface, 'RGB'), surface.get_size())
+        )
+        self.frames += 1
+
+    def close(self):
+        """Дожидается записи всех кадров и завершает поток"""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        """Поток записи: пишет кадры из очереди до метки _STOP"""
+        try:
+            if self.fmt == RAW:
+                with self.path.open('wb') as file:
+                    for data, _ in iter(self.queue.get, _STOP):
+                        file.write(data)
+            else:
+                for number, (data, size) in enumerate(
+                    iter(self.queue.get, _STOP)
+                ):
+                    pg.image.save(
+                        pg.image.frombytes(data, size, 'RGB'),
+                        str(self.path / f'frame_{number:06d}.png'),
+                    )
+        except Exception as error:
+            self.error = error
+            # Освобождает игровой цикл, если он ждет места в очереди
+            while self.queue.get() is not _STOP:
+                pass
+
+
+def export_replay(replay_path, output, fmt=RAW, count=None,
+                  queue_size=QUEUE_SIZE):
+    """
+    Воспроизводит запись игры и сохраняет кадр каждого тика
+    Окно не открывается: без явно заданного SDL_VIDEODRIVER
+    используется драйвер dummy
+    :count: Количество тиков; None — вся запись
+    :return: количество записанных кадров
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pg.init()
+    init_display()
+    screen = get_screen()
+    screen.fill(BOARD_BACKGROUND_COLOR)
+    with ReplayPlayer(replay_path) as player:
+        engine = player.engine
+        renderer = (
+            None if engine.board.fits_screen() else ChunkRenderer(engine.board)
+        )
+        with FrameWriter(output, fmt, queue_size) as writer:
+            for _, _, done in player.play(count):
+                if done:
+                    screen.fill(BOARD_BACKGROUND_COLOR)
+                if renderer is not None:
+                    renderer.draw(engine.snake, engine.apple)
+                else:
+                    screen.blits(
+                        engine.snake.draw() + engine.apple.draw(),
+                        doreturn=False,
+                    )
+                writer.put(screen)
+    return writer.frames
+
+
+def main():
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument('replay', type=Path)
+    parser.add_argument('output', type=Path)
+    parser.add_argument('--format', choices=FORMATS, default=RAW)
+    parser.add_argument('--count', type=int)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    args = parser.parse_args()
+    frames = export_replay(args.replay, args.output, args.format,
+                           args.count, args.queue_size)
+    width, height = get_screen().get_size()
+    print(f'{frames} кадров {width}x{height} записано в {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Наблюдение игрового поля для обучения и аналитики в виде массива NumPy.
+
+ObservedEngine — GameEngine, который поддерживает массив (высота, ширина)
+uint8 с кодами клеток EMPTY, BODY, HEAD и APPLE. Каждый шаг меняет
+не больше четырех клеток: новую голову, прежнюю голову, ушедший хвост
+(Snake.last) и новое яблоко, поэтому обновление стоит O(1). Массив
+полностью перестраивается только в reset.
+
+История последних k полей (frames) включается явно: каждый шаг копирует
+в нее поле целиком, то есть стоит O(высота * ширина).
+"""
+import numpy as np
+
+from the_snake import BOARD, GameEngine
+
+# Коды клеток наблюдения
+EMPTY, BODY, HEAD, APPLE = range(4)
+
+
+def read_only(array):
+    """Возвращает представление массива без права записи (без копирования)"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class ObservedEngine(GameEngine):
+    """
+    ObservedEngine — GameEngine с наблюдением поля, которое обновляется
+    на каждом шаге.
+    :свойство: observation — текущее поле, представление только для чтения.
+    :свойство: frames — последние k полей от старых к новым.
+    """
+
+    def __init__(self, seed=None, board=BOARD, frames=None):
+        """
+        :grid:  Поле (высота, ширина) с кодами клеток.
+        :frames_count:  Сколько последних полей хранить (k); 0 или None —
+          история выключена, и шаг не копирует поле.
+        :history:  Кольцо 2k полей: каждое поле пишется в ячейки i и i + k,
+          поэтому последние k полей всегда лежат подряд. None без истории.
+        :frame:  Количество записанных полей.
+        """
+        super().__init__(seed, board)
+        self.grid = np.zeros((board.height, board.width), dtype=np.uint8)
+        self.frames_count = frames or 0
+        self.history = None
+        if self.frames_count:
+            self.history = np.zeros(
+                (2 * self.frames_count, board.height, board.width),
+                dtype=np.uint8,
+            )
+        self.frame = 0
+        self.observation = read_only(self.grid)
+        self.rebuild()
+
+    @property
+    def frames(self):
+        """
+        Последние frames_count полей от старых к новым, без копирования;
+        None, если история выключена
+        """
+        if not self.frames_count:
+            return None
+        start = self.frame % self.frames_count
+        return read_only(self.history[start:start + self.frames_count])
+
+    def rebuild(self):
+        """Заполняет поле заново по змейке и яблоку и очищает историю"""
+        grid = self.grid
+        grid.fill(EMPTY)
+        for x, y in self.snake.positions:
+            grid[y, x] = BODY
+        x, y = self.snake.get_head_position
+        grid[y, x] = HEAD
+        x, y = self.apple.position
+        grid[y, x] = APPLE
+        if self.frames_count:
+            self.history[:] = grid
+        self.frame = 0
+
+    def reset(self, seed=None):
+        """Начинает новую игру и перестраивает поле"""
+        state = super().reset(seed)
+        self.rebuild()
+        return state
+
+    def step(self, action=None):
+        """Выполняет шаг GameEngine.step и обновляет поле за O(1)"""
+        apple = self.apple.position
+        result = super().step(action)
+        grid = self.grid
+        snake = self.snake
+        if snake.last is not None and not snake.is_occupied(snake.last):
+            grid[snake.last[1], snake.last[0]] = EMPTY
+        if len(snake.positions) > 1:
+            x, y = snake.positions[1]
+            grid[y, x] = BODY
+        x, y = snake.get_head_position
+        grid[y, x] = HEAD
+        if self.apple.position != apple:
+            x, y = self.apple.position
+            grid[y, x] = APPLE
+        self.push_frame()
+        return result
+
+    def push_frame(self):
+        """
+        Записывает текущее поле в кольцо истории: копия всего поля,
+        O(высота * ширина). Без истории ничего не делает.
+        """
+        if not self.frames_count:
+            return
+        self.frame += 1
+        slot = (self.frame - 1) % self.frames_count
+        self.history[slot] = self.grid
+        self.history[slot + self.frames_count] = self.grid
@@ -0,0 +1,241 @@
+"""Компактная детерминированная запись игры и ее воспроизведение.
+
+Формат файла (little-endian):
+    заголовок HEADER: сигнатура, версия, seed, интервал снимков K,
+        число тиков, число снимков, ширина и высота поля;
+    направления: по 2 бита на тик (код из DIRECTIONS), 4 тика в байте;
+    индекс снимков: пары (тик, смещение снимка в файле);
+    снимки: SNAPSHOT и индексы клеток тела от головы к хвосту (uint32).
+
+Каждые K тиков генератор случайных чисел движка пересеивается значением,
+зависящим только от seed и номера тика, а индекс свободных клеток
+перестраивается в каноническом порядке. Поэтому снимку не нужно хранить
+состояние генератора, а перемотка к любому тику стоит не больше K шагов.
+"""
+import mmap
+import random
+import struct
+from array import array
+from collections import deque
+
+from the_snake import BOARD, DIRECTIONS, Board, FreeCells, GameEngine
+
+MAGIC = b'SNKR'
+VERSION = 2
+# Сигнатура, версия, seed, интервал снимков, число тиков, число снимков,
+# ширина и высота поля
+HEADER = struct.Struct('<4sHQIQIII')
+# Тик снимка и смещение снимка в файле
+INDEX_ENTRY = struct.Struct('<QQ')
+# Тики с начала игры, длина, код направления, клетка яблока, число клеток
+SNAPSHOT = struct.Struct('<QIBII')
+# Интервал снимков по умолчанию
+SNAPSHOT_INTERVAL = 1024
+SEED_MASK = (1 << 63) - 1
+
+
+def snapshot_seed(seed, tick):
+    """Зерно генератора движка, которое ставится на тике снимка"""
+    return (seed * 0x9E3779B97F4A7C15 + tick) & SEED_MASK
+
+
+def sync_point(engine, seed, tick):
+    """
+    Приводит движок к состоянию, зависящему только от снимка: пересеивает
+    генератор и перестраивает индекс свободных клеток, порядок которого
+    влияет на выбор клетки для яблока
+    """
+    engine.rng.seed(snapshot_seed(seed, tick))
+    rebuild_free_cells(engine)
+
+
+def rebuild_free_cells(engine):
+    """Строит индекс свободных клеток змейки заново в порядке клеток"""
+    snake = engine.snake
+    snake.free_cells = FreeCells(board=engine.board)
+    for cell in sorted(snake.occupied):
+        snake.free_cells.remove(cell)
+
+
+def take_snapshot(engine):
+    """Возвращает компактный снимок состояния движка в виде bytes"""
+    snake = engine.snake
+    width = engine.board.width
+    body = array('I', (y * width + x for x, y in snake.positions))
+    apple_x, apple_y = engine.apple.position
+    return SNAPSHOT.pack(
+        engine.ticks, snake.length, DIRECTIONS.index(snake.direction),
+        apple_y * width + apple_x, len(body),
+    ) + body.tobytes()
+
+
+def restore_snapshot(engine, buffer, offset=0):
+    """Восстанавливает состояние движка из снимка в buffer"""
+    ticks, length, code, apple, count = SNAPSHOT.unpack_from(buffer, offset)
+    body = array('I')
+    start = offset + SNAPSHOT.size
+    body.frombytes(buffer[start:start + count * body.itemsize])
+    width = engine.board.width
+    snake = engine.snake
+    snake.positions = deque((cell % width, cell // width) for cell in body)
+    snake.occupied = {}
+    for position in snake.positions:
+        snake.occupied[position] = snake.occupied.get(position, 0) + 1
+    snake.length = length
+    snake.direction = DIRECTIONS[code]
+    snake.next_direction = None
+    snake.input_queue.clear()
+    snake.last = None
+    snake.redraw = True
+    rebuild_free_cells(engine)
+    engine.apple.position = (apple % width, apple // width)
+    engine.ticks = ticks
+
+
+class RecordingEngine(GameEngine):
+    """
+    GameEngine, который записывает примененное на каждом тике направление
+    и каждые interval тиков делает снимок состояния.
+    Как и в main(), после окончания игры вызывающий код должен вызвать
+    reset(): воспроизведение повторяет это правило.
+    :метод: save — сохраняет запись в файл.
+    """
+
+    def __init__(self, seed=None, interval=SNAPSHOT_INTERVAL, board=BOARD):
+        """
+        :seed:  Зерно записи; None — случайное.
+        :board:  Игровое поле.
+        :interval:  Интервал снимков в тиках.
+        :directions:  Упакованные коды направлений, 4 тика в байте.
+        :snapshots:  Список пар (тик, снимок).
+        :total_ticks:  Количество записанных тиков.
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        super().__init__(seed, board)
+        self.seed = seed
+        self.interval = interval
+        self.directions = bytearray()
+        self.snapshots = []
+        self.total_ticks = 0
+
+    def step(self, action=None):
+        """Выполняет тик GameEngine.step и записывает его направление"""
+        tick = self.total_ticks
+        if tick % self.interval == 0:
+            sync_point(self, self.seed, tick)
+            self.snapshots.append((tick, take_snapshot(self)))
+        result = super().step(action)
+        code = DIRECTIONS.index(self.snake.direction)
+        if tick % 4 == 0:
+            self.directions.append(code)
+        else:
+            self.directions[-1] |= code << (2 * (tick % 4))
+        self.total_ticks += 1
+        return result
+
+    def save(self, path):
+        """Сохраняет запись в файл path"""
+        if not self.snapshots:
+            self.snapshots.append((0, take_snapshot(self)))
+        offset = (
+            HEADER.size + len(self.directions)
+            + INDEX_ENTRY.size * len(self.snapshots)
+        )
+        index = bytearray()
+        for tick, snapshot in self.snapshots:
+            index += INDEX_ENTRY.pack(tick, offset)
+            offset += len(snapshot)
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(
+                MAGIC, VERSION, self.seed, self.interval, self.total_ticks,
+                len(self.snapshots), *self.board,
+            ))
+            file.write(self.directions)
+            file.write(index)
+            for _, snapshot in self.snapshots:
+                file.write(snapshot)
+
+
+class ReplayPlayer:
+    """
+    ReplayPlayer читает запись через mmap и воспроизводит ее по правилам
+    Snake.move и Apple.randomize_position.
+    :метод: direction — направление, примененное на тике.
+    :метод: seek — состояние игры перед заданным тиком.
+    :метод: play — генератор результатов шагов от заданного тика.
+    """
+
+    def __init__(self, path):
+        """
+        :seed, interval, ticks:  Параметры записи из заголовка.
+        :engine:  GameEngine, на котором идет воспроизведение.
+        :tick:  Номер следующего воспроизводимого тика.
+        """
+        self.file = open(path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.seed, self.interval, self.ticks,
+         snapshots, width, height) = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} не является записью игры')
+        self.directions_offset = HEADER.size
+        self.index_offset = self.directions_offset + (self.ticks + 3) // 4
+        self.snapshot_count = snapshots
+        self.engine = GameEngine(self.seed, Board(width, height))
+        self.tick = None
+
+    def __enter__(self):
+        """Позволяет использовать плеер в конструкции with"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Закрывает файл записи при выходе из with"""
+        self.close()
+
+    def close(self):
+        """Закрывает файл записи"""
+        self.buffer.close()
+        self.file.close()
+
+    def direction(self, tick):
+        """Возвращает направление, примененное на тике tick"""
+        byte = self.buffer[self.directions_offset + tick // 4]
+        return DIRECTIONS[(byte >> (2 * (tick % 4))) & 3]
+
+    def seek(self, tick):
+        """
+        Переводит движок в состояние перед тиком tick: восстанавливает
+        ближайший предыдущий снимок и доигрывает не больше interval тиков.
+        :return: GameEngine
+        """
+        if not 0 <= tick <= self.ticks:
+            raise IndexError(f'Тик {tick} вне записи из {self.ticks} тиков')
+        number = min(tick // self.interval, self.snapshot_count - 1)
+        snapshot_tick, offset = INDEX_ENTRY.unpack_from(
+            self.buffer, self.index_offset + number * INDEX_ENTRY.size
+        )
+        restore_snapshot(self.engine, self.buffer, offset)
+        self.tick = snapshot_tick
+        for _ in self.play(tick - snapshot_tick):
+            pass
+        return self.engine
+
+    def play(self, count=None):
+        """
+        Воспроизводит count тиков (по умолчанию — до конца записи)
+        с текущего тика, перезапуская игру после ее окончания, как main()
+        :return: генератор (state, reward, done)
+        """
+        if self.tick is None:
+            self.seek(0)
+        end = self.ticks if count is None else self.tick + count
+        engine = self.engine
+        while self.tick < end:
+            if self.tick % self.interval == 0:
+                sync_point(engine, self.seed, self.tick)
+            result = engine.step(self.direction(self.tick))
+            if result[2]:
+                engine.reset()
+            self.tick += 1
+            yield result
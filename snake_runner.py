@@ -0,0 +1,244 @@
+"""Многопроцессный прогон игр по правилам Snake/Apple.
+
+Игры раздаются пачками в пул процессов; каждая пачка играется
+со своим фиксированным seed, поэтому результат не зависит от числа
+процессов. Запуск: python snake_runner.py --games 10000 --policy greedy
+С --stats games.jsonl вместо итогов по играм собирается потоковая
+статистика snake_stats, которая периодически дописывается в файл.
+"""
+import argparse
+import os
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from time import perf_counter
+
+from snake_autopilot import HAMILTONIAN, Autopilot
+from snake_stats import GameStats, StatsLog
+from the_snake import (
+    APPLE_REWARD, DEATH_REWARD, DOWN, LEFT, RIGHT, UP, GameEngine,
+)
+
+# Ограничение длины одной игры в тиках
+MAX_TICKS = 10_000
+
+# Причины окончания игры
+SELF_COLLISION = 'self_collision'
+BOARD_FULL = 'board_full'
+TIMEOUT = 'timeout'
+
+# Результат одной игры: score — snake.length, ticks — прожитые тики
+GameResult = namedtuple('GameResult', 'score ticks cause')
+
+
+def straight_policy(engine):
+    """Политика: не менять направление"""
+    return None
+
+
+def random_policy(engine):
+    """Политика: случайное направление на каждом тике"""
+    return engine.rng.choice((UP, DOWN, LEFT, RIGHT, None))
+
+
+def greedy_policy(engine):
+    """Политика: кратчайший шаг к яблоку с учетом переноса через край,
+    избегая клеток тела, если есть свободный ход.
+    """
+    snake = engine.snake
+    width, height = engine.board
+    head_x, head_y = snake.get_head_position
+    apple_x, apple_y = engine.apple.position
+    best = None
+    for direction in (UP, DOWN, LEFT, RIGHT):
+        if (direction[0] + snake.direction[0],
+                direction[1] + snake.direction[1]) == (0, 0):
+            continue
+        cell = ((head_x + direction[0]) % width,
+                (head_y + direction[1]) % height)
+        dx = abs(cell[0] - apple_x)
+        dy = abs(cell[1] - apple_y)
+        distance = min(dx, width - dx) + min(dy, height - dy)
+        candidate = (snake.is_occupied(cell), distance, direction)
+        if best is None or candidate[:2] < best[:2]:
+            best = candidate
+    return best[2]
+
+
+POLICIES = {
+    'straight': straight_policy,
+    'random': random_policy,
+    'greedy': greedy_policy,
+    'autopilot': Autopilot(),
+    'hamiltonian': Autopilot(mode=HAMILTONIAN),
+}
+
+
+def play_game(engine, policy, max_ticks=MAX_TICKS, stats=None):
+    """
+    Играет одну игру до конца на переданном движке
+    :stats: GameStats для ожидания яблок или None
+    :return: GameResult
+    """
+    spawned = 0
+    for _ in range(max_ticks):
+        state, reward, done = engine.step(policy(engine))
+        if reward == APPLE_REWARD and stats is not None:
+            stats.add_apple_wait(engine.ticks - spawned)
+            spawned = engine.ticks
+        if done:
+            cause = SELF_COLLISION if reward == DEATH_REWARD else BOARD_FULL
+            return GameResult(state.length, engine.ticks, cause)
+    return GameResult(engine.snake.length, engine.ticks, TIMEOUT)
+
+
+def play_games(policy_name, seed, games, max_ticks=MAX_TICKS):
+    """
+    Задача процесса: играет пачку игр с фиксированным seed.
+    Политика передается по имени, чтобы задача была сериализуемой.
+    :return: list[GameResult]
+    """
+    policy = POLICIES[policy_name]
+    engine = GameEngine(seed)
+    results = []
+    for _ in range(games):
+        engine.reset()
+        results.append(play_game(engine, policy, max_ticks))
+    return results
+
+
+def play_games_stats(policy_name, seed, games, max_ticks=MAX_TICKS):
+    """
+    Задача процесса: как play_games, но вместо списка результатов
+    возвращает потоковую статистику пачки
+    :return: GameStats
+    """
+    policy = POLICIES[policy_name]
+    engine = GameEngine(seed)
+    stats = GameStats(engine.board.size, max_ticks)
+    for _ in range(games):
+        engine.reset()
+        stats.add_game(*play_game(engine, policy, max_ticks, stats))
+    return stats
+
+
+class RunStats:
+    """Агрегированная статистика прогона, собираемая по мере поступления
+    результатов от процессов
+    """
+
+    def __init__(self):
+        """
+        :games:  Количество сыгранных игр.
+        :total_score, max_score:  Сумма и максимум snake.length.
+        :total_ticks:  Сумма прожитых тиков.
+        :causes:  Счетчик причин окончания игр.
+        """
+        self.games = 0
+        self.total_score = 0
+        self.max_score = 0
+        self.total_ticks = 0
+        self.causes = Counter()
+
+    def add(self, results):
+        """Добавляет результаты пачки игр"""
+        for result in results:
+            self.games += 1
+            self.total_score += result.score
+            self.max_score = max(self.max_score, result.score)
+            self.total_ticks += result.ticks
+            self.causes[result.cause] += 1
+
+    def as_dict(self):
+        """Возвращает итоговую статистику в виде словаря"""
+        games = self.games or 1
+        return {
+            'games': self.games,
+            'mean_score': self.total_score / games,
+            'max_score': self.max_score,
+            'mean_ticks': self.total_ticks / games,
+            'causes': dict(self.causes),
+        }
+
+
+def run(policy_name='greedy', games=1_000, seed=0, workers=None,
+        chunk_size=50, max_ticks=MAX_TICKS):
+    """
+    Раздает игры пачками по chunk_size в пул процессов и объединяет
+    результаты по мере их готовности. Пачка с номером i играется с seed
+    seed + i, поэтому итог не зависит от числа процессов.
+    :return: RunStats
+    """
+    stats = RunStats()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                play_games, policy_name, seed + i,
+                min(chunk_size, games - start), max_ticks,
+            )
+            for i, start in enumerate(range(0, games, chunk_size))
+        ]
+        for future in as_completed(futures):
+            stats.add(future.result())
+    return stats
+
+
+def run_stats(policy_name='greedy', games=1_000, seed=0, workers=None,
+              chunk_size=50, max_ticks=MAX_TICKS, log=None):
+    """
+    Как run, но процессы возвращают GameStats пачек, которые
+    объединяются по мере готовности; после каждого объединения итог
+    дописывается в StatsLog log (не чаще его interval)
+    :return: GameStats
+    """
+    total = GameStats(GameEngine().board.size, max_ticks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                play_games_stats, policy_name, seed + i,
+                min(chunk_size, games - start), max_ticks,
+            )
+            for i, start in enumerate(range(0, games, chunk_size))
+        ]
+        for future in as_completed(futures):
+            total.merge(future.result())
+            if log is not None:
+                log.flush(total)
+    if log is not None:
+        log.flush(total, force=True)
+    return total
+
+
+def main():
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--policy', choices=POLICIES, default='greedy')
+    parser.add_argument('--games', type=int, default=1_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=50)
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS)
+    parser.add_argument('--stats', type=Path)
+    parser.add_argument('--flush-interval', type=float, default=10.0)
+    args = parser.parse_args()
+    start = perf_counter()
+    if args.stats:
+        stats = run_stats(args.policy, args.games, args.seed, args.workers,
+                          args.chunk_size, args.max_ticks,
+                          StatsLog(args.stats, args.flush_interval))
+        ticks = stats.ticks
+        print(f'mean_score={stats.score.moments.mean:.2f} '
+              f'p99_survival={stats.survival.quantiles[-1].value} '
+              f'causes={dict(stats.causes)}')
+    else:
+        stats = run(args.policy, args.games, args.seed, args.workers,
+                    args.chunk_size, args.max_ticks)
+        ticks = stats.total_ticks
+        print(stats.as_dict())
+    seconds = perf_counter() - start
+    print(f'{ticks / seconds:,.0f} ticks/s '
+          f'on {args.workers} workers')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""Асинхронный сервер игры: авторитетный игровой цикл main() без окна.
+
+Каждое TCP-подключение — отдельная сессия со своим GameEngine. Все
+сессии продвигаются одним циклом SPEED раз в секунду. Клиент шлет байты
+с кодами направлений из DIRECTIONS, которые попадают в очередь нажатий
+змейки так же, как клавиши из handle_keys. Сервер в каждом тике шлет
+только изменения: новую клетку головы, ушедший хвост (Snake.last)
+и новую клетку яблока. Полное состояние (SNAPSHOT) отправляется при
+подключении, после перезапуска игры и после пропуска тиков.
+
+Буфер отправки каждого клиента ограничен: пока в нем больше
+buffer_limit байт, тики клиенту не отправляются, а когда буфер
+освободится, клиент получит SNAPSHOT вместо пропущенных изменений.
+Медленный клиент не тормозит цикл и не раздувает память сервера.
+
+Клетки передаются индексами y * width + x, little-endian:
+    SNAPSHOT: тип, тик, длина, код направления, яблоко, число клеток,
+        затем клетки тела от головы к хвосту (uint32);
+    DELTA: тип, тик, голова, хвост или -1, яблоко или -1 (не сдвинулось).
+Запуск: python snake_server.py --port 8765
+"""
+import argparse
+import asyncio
+import struct
+from array import array
+from collections import deque
+
+from the_snake import BOARD, DIRECTIONS, SPEED, GameEngine
+
+SNAPSHOT_TYPE = 0
+DELTA_TYPE = 1
+SNAPSHOT = struct.Struct('<BQIBiI')
+DELTA = struct.Struct('<BQiii')
+
+# Сколько байт может ждать отправки одному клиенту
+BUFFER_LIMIT = 64 * 1024
+# Сколько байт команд читается от клиента за раз
+READ_SIZE = 64
+
+
+def to_index(cell, board):
+    """Переводит координаты клетки в индекс y * width + x"""
+    return cell[1] * board.width + cell[0]
+
+
+def encode_snapshot(engine, tick):
+    """Кодирует полное состояние сессии"""
+    board = engine.board
+    snake = engine.snake
+    body = array('I', (to_index(cell, board) for cell in snake.positions))
+    return SNAPSHOT.pack(
+        SNAPSHOT_TYPE, tick, snake.length,
+        DIRECTIONS.index(snake.direction),
+        to_index(engine.apple.position, board), len(body),
+    ) + body.tobytes()
+
+
+class Session:
+    """
+    Session — игра одного клиента на сервере.
+    :метод: command — применяет байты команд клиента.
+    :метод: step — выполняет тик и отправляет клиенту изменения.
+    """
+
+    def __init__(self, writer, seed=None, board=BOARD,
+                 buffer_limit=BUFFER_LIMIT):
+        """
+        :writer:  asyncio.StreamWriter клиента.
+        :engine:  GameEngine сессии.
+        :tick:  Номер тика сессии.
+        :apple:  Клетка яблока, известная клиенту.
+        :stale:  Нужно ли отправить клиенту полное состояние.
+        :skipped:  Сколько тиков не отправлено из-за заполненного буфера.
+        """
+        self.writer = writer
+        self.engine = GameEngine(seed, board)
+        self.buffer_limit = buffer_limit
+        self.tick = 0
+        self.apple = None
+        self.stale = True
+        self.skipped = 0
+
+    def command(self, data):
+        """Ставит направления из байтов data в очередь нажатий змейки"""
+        for code in data:
+            if code < len(DIRECTIONS):
+                self.engine.snake.queue_direction(DIRECTIONS[code])
+
+    def step(self):
+        """Выполняет тик игры и отправляет клиенту изменения"""
+        engine = self.engine
+        _, _, done = engine.step()
+        self.tick += 1
+        if done:
+            engine.reset()
+            self.stale = True
+        if self.writer.transport.get_write_buffer_size() > self.buffer_limit:
+            self.stale = True
+            self.skipped += 1
+            return
+        if self.stale:
+            self.writer.write(encode_snapshot(engine, self.tick))
+            self.apple = engine.apple.position
+            self.stale = False
+            return
+        board = engine.board
+        snake = engine.snake
+        apple = -1
+        if engine.apple.position != self.apple:
+            self.apple = engine.apple.position
+            apple = to_index(self.apple, board)
+        tail = -1 if snake.last is None else to_index(snake.last, board)
+        self.writer.write(DELTA.pack(
+            DELTA_TYPE, self.tick,
+            to_index(snake.get_head_position, board), tail, apple,
+        ))
+
+
+class GameServer:
+    """
+    GameServer принимает TCP-подключения и продвигает все сессии одним
+    циклом с частотой rate тиков в секунду.
+    :метод: start — начинает принимать подключения.
+    :метод: tick — один тик всех сессий.
+    :метод: run — игровой цикл.
+    """
+
+    def __init__(self, board=BOARD, rate=SPEED, buffer_limit=BUFFER_LIMIT):
+        """
+        :sessions:  Подключенные сессии в порядке подключения и задачи,
+          которые их обслуживают.
+        :server:  asyncio.Server после start.
+        """
+        self.board = board
+        self.rate = rate
+        self.buffer_limit = buffer_limit
+        self.sessions = {}
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Начинает принимать подключения
+        :return: номер порта
+        """
+        self.server = await asyncio.start_server(self.serve, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve(self, reader, writer):
+        """Обслуживает одного клиента до отключения"""
+        session = Session(writer, board=self.board,
+                          buffer_limit=self.buffer_limit)
+        self.sessions[session] = asyncio.current_task()
+        try:
+            while data := await reader.read(READ_SIZE):
+                session.command(data)
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[session]
+            writer.close()
+
+    def tick(self):
+        """Выполняет один тик всех сессий"""
+        for session in self.sessions:
+            session.step()
+
+    async def run(self):
+        """Игровой цикл: тики по расписанию без накопления отставания"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            self.tick()
+            deadline = max(deadline + 1 / self.rate, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+
+    async def close(self):
+        """Прекращает прием подключений и отключает клиентов"""
+        self.server.close()
+        tasks = list(self.sessions.values())
+        for session in self.sessions:
+            session.writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+
+class Replica:
+    """
+    Replica восстанавливает состояние игры из потока сообщений сервера
+    на стороне клиента.
+    :метод: feed — разбирает очередную порцию байтов.
+    """
+
+    def __init__(self):
+        """
+        :body:  Клетки тела от головы к хвосту.
+        :tick, apple:  Последний полученный тик и клетка яблока.
+        """
+        self.buffer = bytearray()
+        self.body = deque()
+        self.tick = 0
+        self.apple = None
+
+    def feed(self, data):
+        """Разбирает все полные сообщения в накопленных байтах"""
+        self.buffer += data
+        while self.buffer:
+            if self.buffer[0] == SNAPSHOT_TYPE:
+                size = self.read_snapshot()
+            else:
+                size = self.read_delta()
+            if not size:
+                return
+            del self.buffer[:size]
+
+    def read_snapshot(self):
+        """Применяет SNAPSHOT; возвращает его размер или 0, если он неполный"""
+        if len(self.buffer) < SNAPSHOT.size:
+            return 0
+        _, tick, _, _, apple, count = SNAPSHOT.unpack_from(self.buffer)
+        size = SNAPSHOT.size + 4 * count
+        if len(self.buffer) < size:
+            return 0
+        body = array('I')
+        body.frombytes(self.buffer[SNAPSHOT.size:size])
+        self.body = deque(body)
+        self.tick, self.apple = tick, apple
+        return size
+
+    def read_delta(self):
+        """Применяет DELTA; возвращает его размер или 0, если он неполный"""
+        if len(self.buffer) < DELTA.size:
+            return 0
+        _, self.tick, head, tail, apple = DELTA.unpack_from(self.buffer)
+        self.body.appendleft(head)
+        if tail >= 0:
+            self.body.pop()
+        if apple >= 0:
+            self.apple = apple
+        return DELTA.size
+
+
+async def serve_forever(host, port):
+    """Запускает сервер и игровой цикл"""
+    server = GameServer()
+    port = await server.start(host, port)
+    print(f'Сервер змейки слушает {host}:{port}')
+    await server.run()
+
+
+def main():
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(serve_forever(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Компактное состояние игры для поиска с перебором ходов (MCTS,
+expectimax по появлению яблока).
+
+Состояние Snake и Apple хранится в нескольких плоских буферах: тело —
+кольцевой буфер индексов клеток y * width + x, занятость — bytearray по
+клетке на байт. Клонирование — копирование этих буферов одним блоком
+памяти, ход и его отмена — O(1).
+"""
+import random
+from array import array
+
+from snake_autopilot import neighbor_table
+from the_snake import APPLE_REWARD, BOARD, DEATH_REWARD, DIRECTIONS, LEFT
+
+# Яблоко съедено и еще не появилось заново
+NO_APPLE = -1
+
+# Таблицы соседей neighbor_table, общие для состояний одного поля
+NEIGHBORS = {}
+
+
+class CompactState:
+    """
+    CompactState — состояние змейки и яблока для поиска. Правила те же,
+    что у GameEngine.step: перенос через край поля, разворот игнорируется,
+    хвост уходит до проверки столкновения.
+    После съедения яблока apple равно NO_APPLE: поиск сам выбирает клетку
+    нового яблока (place_apple) или разыгрывает ее (spawn_apple).
+    :метод: clone — независимая копия состояния без истории ходов.
+    :метод: apply — ход в направлении action.
+    :метод: undo — отмена последнего хода.
+    """
+
+    __slots__ = (
+        'board', 'neighbors', 'capacity', 'body', 'grid', 'head_ptr',
+        'count', 'length', 'direction', 'apple', 'done', 'history',
+    )
+
+    def __init__(self, board=BOARD):
+        """
+        :board:  Игровое поле.
+        :neighbors:  Таблица соседей клеток neighbor_table.
+        :body:  Кольцевой буфер клеток тела; head_ptr — индекс головы,
+          count — число сегментов (len(Snake.positions)).
+        :grid:  Число сегментов тела в каждой клетке.
+        :length:  Длина змейки (Snake.length).
+        :direction:  Код направления из DIRECTIONS.
+        :apple:  Клетка яблока или NO_APPLE.
+        :done:  Закончилась ли игра.
+        :history:  По три числа на ход: клетка ушедшего хвоста (last) или
+          -1, прежнее направление и прежняя клетка яблока.
+        """
+        if board not in NEIGHBORS:
+            NEIGHBORS[board] = neighbor_table(board)
+        self.board = board
+        self.neighbors = NEIGHBORS[board]
+        # На ячейку больше поля: новая голова не затирает живой хвост
+        self.capacity = board.size + 1
+        self.body = array('i', bytes(4 * self.capacity))
+        self.grid = bytearray(board.size)
+        self.head_ptr = 0
+        self.count = 1
+        self.length = 1
+        self.body[0] = board.center[1] * board.width + board.center[0]
+        self.grid[self.body[0]] = 1
+        self.direction = DIRECTIONS.index(LEFT)
+        self.apple = NO_APPLE
+        self.done = False
+        self.history = array('i')
+
+    @classmethod
+    def from_engine(cls, engine):
+        """Создает состояние по змейке и яблоку GameEngine"""
+        state = cls(engine.board)
+        width = engine.board.width
+        snake = engine.snake
+        state.grid[state.body[0]] = 0
+        state.count = len(snake.positions)
+        for i, (x, y) in enumerate(reversed(snake.positions)):
+            state.body[i] = y * width + x
+            state.grid[y * width + x] += 1
+        state.head_ptr = state.count - 1
+        state.length = snake.length
+        state.direction = DIRECTIONS.index(snake.direction)
+        apple_x, apple_y = engine.apple.position
+        state.apple = apple_y * width + apple_x
+        return state
+
+    @property
+    def head(self):
+        """Клетка головы змейки"""
+        return self.body[self.head_ptr]
+
+    def clone(self):
+        """Возвращает копию состояния; буферы копируются одним блоком"""
+        other = CompactState.__new__(CompactState)
+        other.board = self.board
+        other.neighbors = self.neighbors
+        other.capacity = self.capacity
+        other.body = self.body[:]
+        other.grid = self.grid[:]
+        other.head_ptr = self.head_ptr
+        other.count = self.count
+        other.length = self.length
+        other.direction = self.direction
+        other.apple = self.apple
+        other.done = self.done
+        other.history = array('i')
+        return other
+
+    def apply(self, action=None):
+        """
+        Делает ход
+        :action: Направление UP, DOWN, LEFT, RIGHT или None — не менять.
+        Разворот на 180 градусов игнорируется.
+        :return: (reward, done)
+        """
+        history = self.history
+        history.append(-1)
+        history.append(self.direction)
+        history.append(self.apple)
+        if action is not None:
+            code = DIRECTIONS.index(action)
+            if code != (self.direction + 2) % 4:
+                self.direction = code
+        cell = self.neighbors[4 * self.body[self.head_ptr] + self.direction]
+        self.head_ptr = (self.head_ptr + 1) % self.capacity
+        self.body[self.head_ptr] = cell
+        self.grid[cell] += 1
+        self.count += 1
+        if self.count > self.length:
+            last = self.body[(self.head_ptr - self.count + 1) % self.capacity]
+            self.grid[last] -= 1
+            self.count -= 1
+            history[-3] = last
+        if cell == self.apple:
+            self.apple = NO_APPLE
+            self.done = self.count == self.board.size
+            # Как и в GameEngine.step, на заполненном поле расти некуда
+            self.length += not self.done
+            return APPLE_REWARD, self.done
+        if self.grid[cell] > 1:
+            self.done = True
+            return DEATH_REWARD, True
+        return 0, False
+
+    def undo(self):
+        """Отменяет последний ход apply"""
+        history = self.history
+        apple = history.pop()
+        self.direction = history.pop()
+        last = history.pop()
+        cell = self.body[self.head_ptr]
+        if cell == apple and self.count < self.board.size:
+            self.length -= 1
+        self.apple = apple
+        self.grid[cell] -= 1
+        self.head_ptr = (self.head_ptr - 1) % self.capacity
+        self.count -= 1
+        if last >= 0:
+            self.body[(self.head_ptr - self.count) % self.capacity] = last
+            self.grid[last] += 1
+            self.count += 1
+        self.done = False
+
+    def free_cells(self):
+        """Перебирает клетки, где может появиться яблоко"""
+        return (cell for cell, count in enumerate(self.grid) if not count)
+
+    def place_apple(self, cell):
+        """Ставит яблоко в клетку cell"""
+        self.apple = cell
+
+    def spawn_apple(self, rng=random):
+        """
+        Ставит яблоко в случайную свободную клетку: несколько случайных
+        попыток, затем выбор среди всех свободных клеток
+        :return: клетка яблока или NO_APPLE, если свободных клеток нет
+        """
+        for _ in range(8):
+            cell = rng.randrange(self.board.size)
+            if not self.grid[cell]:
+                self.apple = cell
+                return cell
+        cells = list(self.free_cells())
+        self.apple = rng.choice(cells) if cells else NO_APPLE
+        return self.apple
@@ -0,0 +1,483 @@
+"""Потоковая статистика массовых прогонов игр.
+
+Каждая оценка хранит O(1) памяти независимо от числа игр и тиков:
+    RunningMoments — среднее и дисперсия по Уэлфорду;
+    Histogram — счетчики фиксированных корзин;
+    P2Quantile — квантиль по алгоритму P² (Jain, Chlamtac) по пяти маркерам.
+Оценки из разных процессов объединяются методом merge и сохраняются
+в JSON (as_dict / from_dict), поэтому итог миллиардов тиков собирается
+без записей по отдельным играм.
+"""
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from time import monotonic
+
+# Квантили, которые GameStats отслеживает алгоритмом P²
+QUANTILES = (0.5, 0.9, 0.99)
+# Количество корзин гистограмм GameStats
+BUCKETS = 64
+
+
+class RunningMoments:
+    """
+    RunningMoments — количество, среднее, дисперсия, минимум и максимум
+    потока значений по алгоритму Уэлфорда.
+    :метод: add — учитывает значение.
+    :метод: merge — объединяет с оценкой другого потока (Чан и др.).
+    """
+
+    def __init__(self):
+        """
+        :count:  Количество значений.
+        :mean:  Среднее.
+        :m2:  Сумма квадратов отклонений от среднего.
+        :low, high:  Минимум и максимум.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+
+    @property
+    def variance(self):
+        """Выборочная дисперсия; 0 для меньше чем двух значений"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """Выборочное стандартное отклонение"""
+        return math.sqrt(self.variance)
+
+    def add(self, value):
+        """Учитывает значение value"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+
+    def merge(self, other):
+        """Добавляет значения другой оценки RunningMoments"""
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+        return self
+
+    def as_dict(self):
+        """Состояние оценки для JSON"""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count, 'mean': self.mean, 'm2': self.m2,
+            'std': self.std, 'min': self.low, 'max': self.high,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстанавливает оценку из as_dict"""
+        moments = cls()
+        if data['count']:
+            moments.count = data['count']
+            moments.mean = data['mean']
+            moments.m2 = data['m2']
+            moments.low = data['min']
+            moments.high = data['max']
+        return moments
+
+
+class Histogram:
+    """
+    Histogram — гистограмма с buckets корзинами равной ширины на отрезке
+    [low, high) и двумя корзинами для значений вне него.
+    :метод: add — учитывает значение.
+    :метод: merge — складывает счетчики гистограммы с теми же корзинами.
+    :метод: quantile — квантиль с интерполяцией внутри корзины.
+    """
+
+    def __init__(self, low, high, buckets=BUCKETS):
+        """
+        :counts:  Счетчики корзин.
+        :under, over:  Количество значений меньше low и не меньше high.
+        """
+        self.low = low
+        self.high = high
+        self.width = (high - low) / buckets
+        self.counts = [0] * buckets
+        self.under = 0
+        self.over = 0
+
+    @property
+    def count(self):
+        """Количество учтенных значений"""
+        return sum(self.counts) + self.under + self.over
+
+    def add(self, value):
+        """Учитывает значение value"""
+        if value < self.low:
+            self.under += 1
+        elif value >= self.high:
+            self.over += 1
+        else:
+            self.counts[int((value - self.low) / self.width)] += 1
+
+    def merge(self, other):
+        """Добавляет счетчики другой гистограммы с теми же корзинами"""
+        if (other.low, other.high, len(other.counts)) != (
+            self.low, self.high, len(self.counts)
+        ):
+            raise ValueError('Гистограммы с разными корзинами не объединяются')
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.under += other.under
+        self.over += other.over
+        return self
+
+    def quantile(self, q):
+        """
+        Оценивает квантиль q по корзинам
+        :return: значение или None, если гистограмма пуста; low или high,
+        если квантиль попадает за пределы отрезка
+        """
+        count = self.count
+        if not count:
+            return None
+        rank = q * count - self.under
+        if rank <= 0:
+            return self.low
+        for number, bucket in enumerate(self.counts):
+            if rank <= bucket:
+                return self.low + (number + rank / bucket) * self.width
+            rank -= bucket
+        return self.high
+
+    def as_dict(self):
+        """Состояние гистограммы для JSON"""
+        return {
+            'low': self.low, 'high': self.high, 'counts': self.counts,
+            'under': self.under, 'over': self.over,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстанавливает гистограмму из as_dict"""
+        histogram = cls(data['low'], data['high'], len(data['counts']))
+        histogram.counts = list(data['counts'])
+        histogram.under = data['under']
+        histogram.over = data['over']
+        return histogram
+
+
+class P2Quantile:
+    """
+    P2Quantile — оценка квантиля q без хранения значений: пять маркеров,
+    высоты которых подстраиваются параболической интерполяцией.
+    :метод: add — учитывает значение.
+    :метод: merge — приближенное объединение с оценкой другого потока.
+    :свойство: value — текущая оценка квантиля.
+    """
+
+    def __init__(self, q):
+        """
+        :heights:  Высоты маркеров (первые пять значений до заполнения).
+        :positions:  Позиции маркеров (с 1).
+        :desired:  Желаемые позиции маркеров.
+        :increments:  Прирост желаемых позиций на одно значение.
+        """
+        self.q = q
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self.increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    @property
+    def count(self):
+        """Количество учтенных значений"""
+        if len(self.heights) < 5:
+            return len(self.heights)
+        return self.positions[4]
+
+    @property
+    def value(self):
+        """Оценка квантиля или None, если значений нет"""
+        heights = self.heights
+        if len(heights) < 5:
+            if not heights:
+                return None
+            ordered = sorted(heights)
+            return ordered[min(int(self.q * len(ordered)), len(ordered) - 1)]
+        return heights[2]
+
+    def add(self, value):
+        """Учитывает значение value"""
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        for i in range(cell + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        for i in (1, 2, 3):
+            self.adjust(i)
+
+    def adjust(self, i):
+        """Сдвигает маркер i на одну позицию к желаемой, если нужно"""
+        positions = self.positions
+        shift = self.desired[i] - positions[i]
+        if not (
+            shift >= 1 and positions[i + 1] - positions[i] > 1
+            or shift <= -1 and positions[i - 1] - positions[i] < -1
+        ):
+            return
+        step = 1 if shift > 0 else -1
+        heights = self.heights
+        height = self.parabolic(i, step)
+        if not heights[i - 1] < height < heights[i + 1]:
+            height = heights[i] + step * (
+                heights[i + step] - heights[i]
+            ) / (positions[i + step] - positions[i])
+        heights[i] = height
+        positions[i] += step
+
+    def parabolic(self, i, step):
+        """Параболическая (P²) оценка новой высоты маркера i"""
+        n = self.positions
+        h = self.heights
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def merge(self, other):
+        """
+        Объединяет с оценкой другого потока того же квантиля. P² не
+        объединяется точно: высоты маркеров усредняются с весами по
+        количеству значений, крайние маркеры — минимум и максимум.
+        """
+        if other.count < 5 or self.count < 5:
+            small, large = sorted((self, other), key=lambda p: p.count)
+            heights = list(small.heights)
+            self.heights = list(large.heights)
+            self.positions = list(large.positions)
+            self.desired = list(large.desired)
+            for value in heights:
+                self.add(value)
+            return self
+        count = self.count + other.count
+        weight = other.count / count
+        self.heights = [
+            a + (b - a) * weight for a, b in zip(self.heights, other.heights)
+        ]
+        self.heights[0] = min(self.heights[0], other.heights[0])
+        self.heights[4] = max(self.heights[4], other.heights[4])
+        self.positions = [
+            1 + round((count - 1) * (p - 1) / (self.count - 1))
+            for p in self.positions
+        ]
+        self.desired = [
+            1 + (count - 1) * increment for increment in self.increments
+        ]
+        return self
+
+    def as_dict(self):
+        """Состояние оценки для JSON"""
+        return {
+            'q': self.q, 'value': self.value, 'heights': self.heights,
+            'positions': self.positions, 'desired': self.desired,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстанавливает оценку из as_dict"""
+        quantile = cls(data['q'])
+        quantile.heights = list(data['heights'])
+        quantile.positions = list(data['positions'])
+        quantile.desired = list(data['desired'])
+        return quantile
+
+
+class Metric:
+    """
+    Metric — все оценки одной величины: моменты, гистограмма и квантили P².
+    :метод: add — учитывает значение.
+    :метод: merge — объединяет с метрикой другого процесса.
+    """
+
+    def __init__(self, low, high, buckets=BUCKETS, quantiles=QUANTILES):
+        """
+        :moments:  RunningMoments величины.
+        :histogram:  Histogram на отрезке [low, high).
+        :quantiles:  P2Quantile для каждого квантиля из quantiles.
+        """
+        self.moments = RunningMoments()
+        self.histogram = Histogram(low, high, buckets)
+        self.quantiles = [P2Quantile(q) for q in quantiles]
+
+    def add(self, value):
+        """Учитывает значение value"""
+        self.moments.add(value)
+        self.histogram.add(value)
+        for quantile in self.quantiles:
+            quantile.add(value)
+
+    def merge(self, other):
+        """Объединяет с метрикой другого процесса"""
+        self.moments.merge(other.moments)
+        self.histogram.merge(other.histogram)
+        for quantile, estimate in zip(self.quantiles, other.quantiles):
+            quantile.merge(estimate)
+        return self
+
+    def as_dict(self):
+        """Состояние метрики для JSON"""
+        return {
+            'moments': self.moments.as_dict(),
+            'histogram': self.histogram.as_dict(),
+            'quantiles': [quantile.as_dict() for quantile in self.quantiles],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстанавливает метрику из as_dict"""
+        metric = cls.__new__(cls)
+        metric.moments = RunningMoments.from_dict(data['moments'])
+        metric.histogram = Histogram.from_dict(data['histogram'])
+        metric.quantiles = [
+            P2Quantile.from_dict(quantile) for quantile in data['quantiles']
+        ]
+        return metric
+
+
+class GameStats:
+    """
+    GameStats — статистика прогона игр: длина змейки в конце игры (score),
+    прожитые тики, ожидание яблока в тиках от появления до съедения
+    и причины окончания игр.
+    :метод: add_game — учитывает завершенную игру.
+    :метод: add_apple_wait — учитывает съеденное яблоко.
+    :метод: merge — объединяет со статистикой другого процесса.
+    """
+
+    def __init__(self, max_score, max_ticks):
+        """
+        :games, ticks:  Количество игр и тиков.
+        :score, survival, apple_wait:  Метрики Metric.
+        :causes:  Счетчик причин окончания игр.
+        """
+        self.games = 0
+        self.ticks = 0
+        self.score = Metric(0, max_score + 1)
+        self.survival = Metric(0, max_ticks + 1)
+        self.apple_wait = Metric(0, max_ticks + 1)
+        self.causes = Counter()
+
+    def add_game(self, score, ticks, cause):
+        """Учитывает завершенную игру"""
+        self.games += 1
+        self.ticks += ticks
+        self.score.add(score)
+        self.survival.add(ticks)
+        self.causes[cause] += 1
+
+    def add_apple_wait(self, ticks):
+        """Учитывает яблоко, съеденное через ticks тиков после появления"""
+        self.apple_wait.add(ticks)
+
+    def merge(self, other):
+        """Объединяет со статистикой другого процесса"""
+        self.games += other.games
+        self.ticks += other.ticks
+        self.score.merge(other.score)
+        self.survival.merge(other.survival)
+        self.apple_wait.merge(other.apple_wait)
+        self.causes.update(other.causes)
+        return self
+
+    def as_dict(self):
+        """Состояние статистики для JSON"""
+        return {
+            'games': self.games, 'ticks': self.ticks,
+            'score': self.score.as_dict(),
+            'survival': self.survival.as_dict(),
+            'apple_wait': self.apple_wait.as_dict(),
+            'causes': dict(self.causes),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстанавливает статистику из as_dict"""
+        stats = cls.__new__(cls)
+        stats.games = data['games']
+        stats.ticks = data['ticks']
+        stats.score = Metric.from_dict(data['score'])
+        stats.survival = Metric.from_dict(data['survival'])
+        stats.apple_wait = Metric.from_dict(data['apple_wait'])
+        stats.causes = Counter(data['causes'])
+        return stats
+
+
+class StatsLog:
+    """
+    StatsLog дописывает состояние статистики в файл JSON lines не чаще
+    одного раза в interval секунд. Каждая строка — полный накопленный
+    итог, поэтому для возобновления достаточно последней строки.
+    :метод: flush — записывает строку, если прошло interval секунд.
+    """
+
+    def __init__(self, path, interval=10.0):
+        """
+        :path:  Файл JSON lines.
+        :written:  Время последней записи (monotonic).
+        """
+        self.path = Path(path)
+        self.interval = interval
+        self.written = None
+
+    def flush(self, stats, force=False):
+        """
+        Дописывает строку со stats.as_dict()
+        :force: Записать независимо от interval
+        :return: записана ли строка
+        """
+        now = monotonic()
+        if not force and self.written is not None and (
+            now - self.written < self.interval
+        ):
+            return False
+        with self.path.open('a', encoding='utf-8') as file:
+            file.write(json.dumps(stats.as_dict(), separators=(',', ':')))
+            file.write('\n')
+        self.written = now
+        return True
+
+
+def read_last(path):
+    """
+    Читает последнюю строку файла StatsLog
+    :return: GameStats или None, если файл пуст
+    """
+    line = None
+    with Path(path).open(encoding='utf-8') as file:
+        for line in file:
+            pass
+    return GameStats.from_dict(json.loads(line)) if line else None
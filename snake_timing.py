@@ -0,0 +1,161 @@
+from array import array
+from time import perf_counter
+
+# Фазы игрового тика в порядке их выполнения в main()
+INPUT, LOGIC, DRAW, DISPLAY = range(4)
+PHASES = ('input', 'logic', 'draw', 'display')
+
+# Размер кольцевого буфера в кадрах
+CAPACITY = 1024
+
+# Статистика на оверлее пересчитывается раз в HUD_REFRESH кадров
+HUD_REFRESH = 10
+HUD_COLOR = (255, 255, 255)
+HUD_BACKGROUND_COLOR = (0, 0, 0)
+HUD_FONT_SIZE = 18
+
+
+def _noop(*args):
+    """Заглушка для методов выключенного таймера"""
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль fraction (от 0 до 1) списка значений"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class FrameTimer:
+    """
+    FrameTimer замеряет время каждой фазы тика и хранит замеры последних
+    capacity кадров в кольцевом буфере фиксированного размера.
+    Строка буфера: время начала кадра и длительности фаз PHASES.
+    У выключенного таймера методы заменены заглушкой, поэтому его можно
+    оставлять в коде игры.
+    :метод: start_frame — отмечает начало кадра.
+    :метод: mark — записывает длительность фазы с предыдущей отметки.
+    :метод: stats — FPS, p50/p99 времени кадра и средние по фазам.
+    :метод: draw_hud — рисует оверлей со статистикой.
+    :метод: export — сохраняет замеры в CSV или JSON.
+    """
+
+    def __init__(self, enabled=True, capacity=CAPACITY):
+        """
+        :enabled:  Включен ли сбор замеров.
+        :capacity:  Количество хранимых кадров.
+        :samples:  Кольцевой буфер замеров.
+        :frames:  Количество кадров с начала замеров.
+        """
+        self.enabled = enabled
+        self.capacity = capacity
+        self.width = len(PHASES) + 1
+        self.samples = array('d', bytes(8 * self.width * capacity))
+        self.frames = 0
+        self.row = 0
+        self.last = 0.0
+        self.font = None
+        self.hud_lines = ()
+        if not enabled:
+            self.start_frame = self.mark = _noop
+
+    def start_frame(self):
+        """Отмечает начало нового кадра"""
+        self.row = (self.frames % self.capacity) * self.width
+        self.frames += 1
+        self.last = perf_counter()
+        self.samples[self.row] = self.last
+
+    def mark(self, phase):
+        """Записывает длительность фазы phase с момента прошлой отметки"""
+        now = perf_counter()
+        self.samples[self.row + 1 + phase] = now - self.last
+        self.last = now
+
+    def rows(self):
+        """Возвращает сохраненные строки замеров от старых к новым"""
+        count = min(self.frames, self.capacity)
+        first = self.frames - count
+        return [
+            self.samples[i * self.width:(i + 1) * self.width]
+            for i in (
+                (first + k) % self.capacity for k in range(count)
+            )
+        ]
+
+    def stats(self):
+        """
+        Считает статистику по сохраненным кадрам
+        :return: dict с fps, p50 и p99 времени кадра и средними по фазам
+        (время в миллисекундах)
+        """
+        rows = self.rows()
+        if not rows:
+            return {'fps': 0.0, 'p50': 0.0, 'p99': 0.0}
+        frame_times = [sum(row[1:]) * 1000 for row in rows]
+        elapsed = rows[-1][0] - rows[0][0]
+        result = {
+            'fps': (len(rows) - 1) / elapsed if elapsed else 0.0,
+            'p50': percentile(frame_times, 0.5),
+            'p99': percentile(frame_times, 0.99),
+        }
+        for phase, name in enumerate(PHASES, start=1):
+            result[name] = sum(row[phase] for row in rows) / len(rows) * 1000
+        return result
+
+    def draw_hud(self, surface):
+        """
+        Рисует оверлей с FPS, p50/p99 времени кадра и разбивкой по фазам
+        в левом верхнем углу surface
+        :return: pg.Rect изменившейся области экрана
+        """
+        # pygame нужен только оверлею: импорт модуля его не загружает
+        import pygame as pg
+        if self.font is None:
+            self.font = pg.font.Font(None, HUD_FONT_SIZE)
+        if not self.hud_lines or self.frames % HUD_REFRESH == 0:
+            stats = self.stats()
+            self.hud_lines = (
+                'FPS {fps:.1f}  p50 {p50:.2f} ms  p99 {p99:.2f} ms'.format(
+                    **stats),
+                '  '.join(
+                    f'{name} {stats.get(name, 0.0):.2f}' for name in PHASES
+                ),
+            )
+        images = [
+            self.font.render(line, True, HUD_COLOR, HUD_BACKGROUND_COLOR)
+            for line in self.hud_lines
+        ]
+        rect = pg.Rect(
+            0, 0, max(image.get_width() for image in images),
+            sum(image.get_height() for image in images),
+        )
+        surface.fill(HUD_BACKGROUND_COLOR, rect)
+        top = 0
+        for image in images:
+            surface.blit(image, (0, top))
+            top += image.get_height()
+        return rect
+
+    def export(self, path):
+        """
+        Сохраняет сырые замеры в CSV или JSON (по расширению файла)
+        :path: Путь к файлу
+        """
+        # Модули нужны только экспорту: импорт the_snake их не загружает
+        import csv
+        import json
+        from pathlib import Path
+        path = Path(path)
+        header = ('start',) + PHASES
+        rows = [list(row) for row in self.rows()]
+        if path.suffix == '.json':
+            path.write_text(json.dumps(
+                {'columns': header, 'rows': rows, 'stats': self.stats()}
+            ))
+            return
+        with path.open('w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            writer.writerows(rows)
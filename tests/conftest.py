@@ -86,6 +86,31 @@ def _create_game_object(class_name, module):
         )
 
 
+@pytest.fixture
+def record_game(_the_snake):
+    """Записывает партию жадной политики с 10% случайных ходов в файл"""
+    import random
+
+    import snake_replay
+    from snake_runner import greedy_policy
+
+    def record(path, ticks=500, interval=64):
+        engine = snake_replay.RecordingEngine(seed=11, interval=interval)
+        actions = random.Random(3)
+        states = []
+        for _ in range(ticks):
+            action = greedy_policy(engine)
+            if actions.random() < 0.1:
+                action = actions.choice(_the_snake.DIRECTIONS)
+            state, reward, done = engine.step(action)
+            states.append((state, reward, done))
+            if done:
+                engine.reset()
+        engine.save(path)
+        return states
+    return record
+
+
 @pytest.fixture
 def game_object(_the_snake):
     return _create_game_object('GameObject', _the_snake)
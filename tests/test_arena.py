@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+
+@pytest.fixture
+def snake_arena(_the_snake):
+    import snake_arena
+    return snake_arena
+
+
+def place(arena, snake, cells, direction):
+    """Укладывает змейку в клетки cells (от головы к хвосту)"""
+    snake.remove()
+    snake.respawn(cells[-1])
+    snake.length = len(cells)
+    for cell in cells[-2::-1]:
+        snake.next_cell = cell
+        snake.advance()
+    snake.direction = direction
+
+
+def test_head_to_head_kills_both(_the_snake, snake_arena):
+    arena = snake_arena.Arena(snakes=2, apples=0, seed=1)
+    first, second = arena.snakes
+    place(arena, first, [(5, 5)], _the_snake.RIGHT)
+    place(arena, second, [(7, 5)], _the_snake.LEFT)
+    rewards = arena.step()
+    assert rewards == [_the_snake.DEATH_REWARD] * 2, (
+        'Змейки, вошедшие головами в одну клетку, должны погибнуть обе.'
+    )
+    assert arena.deaths == 2
+
+
+def test_head_swap_kills_both(_the_snake, snake_arena):
+    arena = snake_arena.Arena(snakes=2, apples=0, seed=1)
+    first, second = arena.snakes
+    place(arena, first, [(5, 5)], _the_snake.RIGHT)
+    place(arena, second, [(6, 5)], _the_snake.LEFT)
+    assert arena.step() == [_the_snake.DEATH_REWARD] * 2, (
+        'Змейки, меняющиеся клетками голов, не должны проходить '
+        'друг сквозь друга.'
+    )
+    assert arena.deaths == 2
+
+
+def test_head_into_body_kills_only_attacker(_the_snake, snake_arena):
+    arena = snake_arena.Arena(snakes=2, apples=0, seed=1)
+    first, second = arena.snakes
+    place(arena, first, [(5, 4)], _the_snake.DOWN)
+    place(arena, second, [(6, 5), (5, 5), (4, 5)], _the_snake.RIGHT)
+    rewards = arena.step()
+    assert rewards == [_the_snake.DEATH_REWARD, 0]
+    assert second.get_head_position == (7, 5)
+
+
+def test_head_may_follow_other_tail(_the_snake, snake_arena):
+    arena = snake_arena.Arena(snakes=2, apples=0, seed=1)
+    first, second = arena.snakes
+    place(arena, first, [(3, 5)], _the_snake.RIGHT)
+    place(arena, second, [(6, 5), (5, 5), (4, 5)], _the_snake.RIGHT)
+    assert arena.step() == [0, 0], (
+        'Голова может войти в клетку, которую в этот же тик покидает хвост.'
+    )
+
+
+def test_apple_grows_snake_and_respawns(_the_snake, snake_arena):
+    arena = snake_arena.Arena(snakes=1, apples=1, seed=2)
+    snake = arena.snakes[0]
+    apple = next(iter(arena.apples.values()))
+    head_x, head_y = snake.get_head_position
+    cell = (
+        (head_x + snake.direction[0]) % arena.board.width,
+        (head_y + snake.direction[1]) % arena.board.height,
+    )
+    arena.free_cells.add(apple.position)
+    arena.apples = {cell: apple}
+    apple.position = cell
+    arena.free_cells.remove(cell)
+    assert arena.step() == [_the_snake.APPLE_REWARD]
+    assert snake.length == 2
+    assert list(arena.apples) == [apple.position] != [cell]
+    assert arena.draw()
+
+
+def test_shared_grid_stays_consistent(_the_snake, snake_arena):
+    board = _the_snake.Board(16, 12)
+    arena = snake_arena.Arena(snakes=12, apples=6, seed=3, board=board)
+    rng = random.Random(0)
+    choices = (_the_snake.UP, _the_snake.DOWN, _the_snake.LEFT,
+               _the_snake.RIGHT, None)
+    for _ in range(500):
+        arena.step([rng.choice(choices) for _ in arena.snakes])
+        owned = {
+            cell: snake.number for snake in arena.snakes
+            for cell in snake.positions
+        }
+        assert len(owned) == sum(len(s.positions) for s in arena.snakes)
+        for index, number in enumerate(arena.owner):
+            cell = (index % board.width, index // board.width)
+            assert owned.get(cell, 0) == number
+            assert (cell in arena.free_cells) == (
+                not number and cell not in arena.apples
+            ), 'Общий индекс свободных клеток разошелся с сеткой владельцев.'
@@ -0,0 +1,104 @@
+import pytest
+
+
+@pytest.fixture
+def snake_autopilot(_the_snake):
+    import snake_autopilot
+    return snake_autopilot
+
+
+def test_neighbor_table_wraps_like_move(_the_snake, snake_autopilot):
+    board = _the_snake.Board(5, 3)
+    table = snake_autopilot.neighbor_table(board)
+    for cell in range(board.size):
+        for code, direction in enumerate(_the_snake.DIRECTIONS):
+            snake = _the_snake.Snake(board=board)
+            snake.position = (cell % 5, cell // 5)
+            snake.reset()
+            snake.direction = direction
+            snake.move()
+            x, y = snake.get_head_position
+            assert table[4 * cell + code] == y * 5 + x, (
+                'Таблица соседей должна совпадать с переносом в Snake.move.'
+            )
+
+
+@pytest.mark.parametrize('size', [(6, 4), (5, 5), (1, 7), (7, 1)])
+def test_hamiltonian_cycle_visits_every_cell(
+        _the_snake, snake_autopilot, size):
+    board = _the_snake.Board(*size)
+    order = snake_autopilot.hamiltonian_cycle(board)
+    assert sorted(order) == list(range(board.size))
+    table = snake_autopilot.neighbor_table(board)
+    for cell, following in zip(order, order[1:] + order[:1]):
+        assert following in table[4 * cell:4 * cell + 4], (
+            'Соседние клетки цикла должны быть соседями на поле.'
+        )
+
+
+@pytest.mark.parametrize('size', [(4, 3), (6, 4), (7, 4), (5, 2), (5, 5)])
+def test_hamiltonian_fills_board(_the_snake, snake_autopilot, size):
+    board = _the_snake.Board(*size)
+    pilot = snake_autopilot.Autopilot(board, snake_autopilot.HAMILTONIAN)
+    for seed in range(200):
+        engine = _the_snake.GameEngine(seed, board)
+        for _ in range(board.size ** 2):
+            _, reward, done = engine.step(pilot(engine))
+            if done:
+                break
+        assert done and reward == _the_snake.APPLE_REWARD, (
+            'В режиме гамильтонова цикла змейка должна заполнить всё поле.'
+        )
+
+
+def test_bfs_autopilot_eats_apples(_the_snake, snake_autopilot):
+    pilot = snake_autopilot.Autopilot()
+    engine = _the_snake.GameEngine(seed=3)
+    for _ in range(2_000):
+        _, _, done = engine.step(pilot(engine))
+        assert not done, 'Короткая змейка на автопилоте не должна погибать.'
+    assert engine.snake.length > 50
+
+
+def test_bfs_autopilot_does_not_reverse(_the_snake, snake_autopilot):
+    board = _the_snake.Board(6, 4)
+    pilot = snake_autopilot.Autopilot(board)
+    engine = _the_snake.GameEngine(seed=0, board=board)
+    head_x, head_y = engine.snake.get_head_position
+    engine.snake.direction = _the_snake.RIGHT
+    engine.apple.position = ((head_x - 1) % 6, head_y)
+    assert pilot(engine) != _the_snake.LEFT, (
+        'Автопилот не должен выбирать разворот на 180 градусов.'
+    )
+
+
+def test_update_game_uses_pilot(_the_snake, snake_autopilot):
+    board = _the_snake.Board(6, 4)
+    pilot = snake_autopilot.Autopilot(board, snake_autopilot.HAMILTONIAN)
+    engine = _the_snake.GameEngine(seed=0, board=board)
+    expected = pilot(engine)
+    _the_snake.update_game(engine, pilot)
+    assert engine.snake.direction == expected
+
+
+def test_search_stops_when_budget_is_spent(_the_snake, snake_autopilot):
+    pilot = snake_autopilot.Autopilot()
+    goal = pilot.to_index((16, 12))
+    pilot.budget = 5
+    assert not pilot.search(0, goal, pilot.base, None), (
+        'Поиск, исчерпавший бюджет, должен считаться неудачным.'
+    )
+    assert pilot.budget == 0
+    pilot.budget = snake_autopilot.SEARCH_BUDGET
+    assert pilot.search(0, goal, pilot.base, None)
+    assert pilot.trace(0, goal)[0] == goal
+
+
+def test_bfs_autopilot_survives_long_game(_the_snake, snake_autopilot):
+    pilot = snake_autopilot.Autopilot()
+    engine = _the_snake.GameEngine(seed=4)
+    for _ in range(6_000):
+        _, _, done = engine.step(pilot(engine))
+        assert not done, (
+            'Ограниченный бюджет поиска не должен губить длинную змейку.'
+        )
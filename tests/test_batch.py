@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def snake_batch(_the_snake):
+    import snake_batch
+    return snake_batch
+
+
+def test_batch_invariants(snake_batch):
+    env = snake_batch.BatchSnakeEnv(64, seed=3)
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        env.step(rng.integers(-1, 4, size=env.n))
+        assert (env.grid.sum(axis=1) == env.counts).all(), (
+            'Сетка занятости должна совпадать с телами змеек.'
+        )
+        assert (env.counts <= env.lengths).all()
+        assert (env.grid[env.games, env.apples] == 0).all(), (
+            'Яблоко должно появляться только в свободной клетке.'
+        )
+
+
+def test_batch_matches_snake_rules(_the_snake, snake_batch):
+    env = snake_batch.BatchSnakeEnv(1, width=5, height=5, seed=0)
+    env.directions[:] = snake_batch.DIRECTIONS.index(_the_snake.RIGHT)
+    env.apples[:] = env.center + 1
+    _, rewards, dones = env.step()
+    assert rewards[0] == _the_snake.APPLE_REWARD and not dones[0]
+    assert env.lengths[0] == 2
+    # Перенос через край поля, как в Snake.move
+    env.apples[:] = 0
+    env.lengths[:] = 5
+    for _ in range(2):
+        env.step()
+    assert env.heads_x[0] == 0
+    # Разворот петлей приводит к столкновению и перезапуску игры
+    env.apples[:] = 24
+    codes = [snake_batch.DIRECTIONS.index(d) for d in (
+        _the_snake.DOWN, _the_snake.LEFT, _the_snake.UP,
+    )]
+    dones = [env.step([code])[2][0] for code in codes]
+    assert dones == [False, False, True]
+    assert env.final_lengths[0] == 5
+    assert env.lengths[0] == 1 and env.heads[0] == env.center
+
+
+def test_batch_full_board_does_not_overgrow(_the_snake, snake_batch):
+    env = snake_batch.BatchSnakeEnv(1, width=3, height=1, seed=0)
+    env.directions[:] = snake_batch.DIRECTIONS.index(_the_snake.RIGHT)
+    for _ in range(10):
+        _, rewards, dones = env.step()
+        if dones[0]:
+            break
+    assert dones[0] and rewards[0] == _the_snake.APPLE_REWARD
+    assert env.final_lengths[0] == 3, (
+        'На заполненном поле длина змейки должна равняться размеру поля.'
+    )
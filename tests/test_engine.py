@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+
+from conftest import BASE_DIR
+
+
+def test_import_does_not_open_display():
+    code = (
+        'import pygame, the_snake\n'
+        'assert pygame.display.get_surface() is None\n'
+        'assert not pygame.display.get_init()\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True,
+    )
+    assert result.returncode == 0, (
+        'Импорт модуля `the_snake` не должен создавать игровое окно.\n'
+        f'{result.stderr.decode()}'
+    )
+
+
+def test_rules_do_not_load_pygame():
+    code = (
+        'import sys, the_snake\n'
+        'engine = the_snake.GameEngine(seed=1)\n'
+        'for _ in range(100):\n'
+        '    engine.step()\n'
+        'assert "pygame.display" not in sys.modules\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True,
+        env={**os.environ, 'SDL_VIDEODRIVER': 'no-such-driver'},
+    )
+    assert result.returncode == 0, (
+        'Импорт `the_snake` и GameEngine не должны загружать pygame.\n'
+        f'{result.stderr.decode()}'
+    )
+
+
+def _play(engine, actions):
+    history = []
+    for action in actions:
+        state, reward, done = engine.step(action)
+        history.append((state, reward, done))
+        if done:
+            engine.reset()
+    return history
+
+
+def test_engine_is_deterministic(_the_snake):
+    actions = [_the_snake.UP, None, _the_snake.LEFT, None] * 200
+    first = _the_snake.GameEngine()
+    first.reset(seed=7)
+    second = _the_snake.GameEngine()
+    second.reset(seed=7)
+    assert _play(first, actions) == _play(second, actions)
+
+
+def test_engine_rewards_apple(_the_snake):
+    engine = _the_snake.GameEngine(seed=1)
+    engine.snake.direction = _the_snake.RIGHT
+    head_x, head_y = engine.snake.get_head_position
+    engine.apple.position = (head_x + 1, head_y)
+    state, reward, done = engine.step()
+    assert reward == _the_snake.APPLE_REWARD
+    assert state.length == 2
+    assert not done
+
+
+def test_engine_full_board_does_not_overgrow(_the_snake):
+    board = _the_snake.Board(2, 1)
+    engine = _the_snake.GameEngine(seed=0, board=board)
+    engine.snake.direction = _the_snake.RIGHT
+    for _ in range(board.size):
+        state, reward, done = engine.step()
+        assert reward == _the_snake.APPLE_REWARD
+    assert done
+    assert state.length == board.size, (
+        'На заполненном поле длина змейки должна равняться размеру поля.'
+    )
+
+
+def test_engine_ignores_reverse(_the_snake):
+    engine = _the_snake.GameEngine(seed=1)
+    engine.snake.direction = _the_snake.RIGHT
+    state, _, _ = engine.step(_the_snake.LEFT)
+    assert state.direction == _the_snake.RIGHT
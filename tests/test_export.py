@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BASE_DIR
+
+
+@pytest.fixture
+def snake_export(_the_snake):
+    import snake_export
+    return snake_export
+
+
+def test_import_has_no_side_effects():
+    code = (
+        'import os, sys, snake_export\n'
+        'assert "pygame.display" not in sys.modules\n'
+        'assert "SDL_VIDEODRIVER" not in os.environ\n'
+    )
+    env = {
+        key: value for key, value in os.environ.items()
+        if key != 'SDL_VIDEODRIVER'
+    }
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True,
+        env=env,
+    )
+    assert result.returncode == 0, (
+        'Импорт `snake_export` не должен загружать pygame '
+        'и менять окружение.\n'
+        f'{result.stderr.decode()}'
+    )
+
+
+def _frames(pg, count, size=(8, 6)):
+    frames = []
+    for number in range(count):
+        surface = pg.Surface(size)
+        surface.fill((number, 2 * number, 255 - number))
+        frames.append(surface)
+    return frames
+
+
+def test_raw_writer_keeps_frame_order(snake_export, tmp_path):
+    pg = snake_export.pg
+    frames = _frames(pg, 40)
+    path = tmp_path / 'game.rgb'
+    with snake_export.FrameWriter(path, queue_size=4) as writer:
+        for surface in frames:
+            writer.put(surface)
+    assert writer.frames == len(frames)
+    assert path.read_bytes() == b''.join(
+        pg.image.tobytes(surface, 'RGB') for surface in frames
+    ), 'Файл RAW должен содержать кадры RGB24 подряд в порядке тиков.'
+
+
+def test_png_writer_saves_numbered_files(snake_export, tmp_path):
+    pg = snake_export.pg
+    frames = _frames(pg, 3)
+    with snake_export.FrameWriter(tmp_path, snake_export.PNG) as writer:
+        for surface in frames:
+            writer.put(surface)
+    for number, surface in enumerate(frames):
+        image = pg.image.load(str(tmp_path / f'frame_{number:06d}.png'))
+        assert pg.image.tobytes(image, 'RGB') == pg.image.tobytes(
+            surface, 'RGB'
+        ), 'Кадры PNG должны совпадать с экраном.'
+
+
+def test_writer_error_reaches_game_loop(snake_export, tmp_path):
+    writer = snake_export.FrameWriter(tmp_path / 'missing' / 'game.rgb')
+    with pytest.raises(OSError):
+        for surface in _frames(snake_export.pg, 10):
+            writer.put(surface)
+        writer.close()
+
+
+def test_export_replay(_the_snake, snake_export, record_game, tmp_path):
+    replay = tmp_path / 'game.snkr'
+    record_game(replay, ticks=50)
+    output = tmp_path / 'game.rgb'
+    assert snake_export.export_replay(replay, output) == 50
+    frame_size = _the_snake.SCREEN_WIDTH * _the_snake.SCREEN_HEIGHT * 3
+    assert output.stat().st_size == 50 * frame_size, (
+        'Экспорт должен записать по одному кадру экрана на тик.'
+    )
@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def snake_observation(_the_snake):
+    import snake_observation
+    return snake_observation
+
+
+def expected_grid(engine, snake_observation):
+    """Поле, построенное с нуля по змейке и яблоку"""
+    grid = np.zeros((engine.board.height, engine.board.width), np.uint8)
+    for x, y in engine.snake.positions:
+        grid[y, x] = snake_observation.BODY
+    x, y = engine.snake.get_head_position
+    grid[y, x] = snake_observation.HEAD
+    x, y = engine.apple.position
+    if grid[y, x] == snake_observation.EMPTY:
+        grid[y, x] = snake_observation.APPLE
+    return grid
+
+
+def test_observation_tracks_game(_the_snake, snake_observation):
+    board = _the_snake.Board(8, 6)
+    engine = snake_observation.ObservedEngine(seed=5, board=board)
+    observation = engine.observation
+    assert observation.shape == (6, 8)
+    rng = random.Random(1)
+    choices = (_the_snake.UP, _the_snake.DOWN, _the_snake.LEFT,
+               _the_snake.RIGHT, None, None)
+    for _ in range(2_000):
+        _, _, done = engine.step(rng.choice(choices))
+        if done:
+            engine.reset()
+        assert np.array_equal(
+            observation, expected_grid(engine, snake_observation)
+        ), 'Наблюдение должно совпадать с полем, построенным с нуля.'
+
+
+def test_observation_is_read_only_view(_the_snake, snake_observation):
+    engine = snake_observation.ObservedEngine(seed=1)
+    observation = engine.observation
+    assert np.shares_memory(observation, engine.grid)
+    with pytest.raises(ValueError):
+        observation[0, 0] = 1
+
+
+def test_frames_keep_last_k_in_order(_the_snake, snake_observation):
+    engine = snake_observation.ObservedEngine(seed=2, frames=3)
+    history = [engine.grid.copy()]
+    for _ in range(7):
+        engine.step()
+        history.append(engine.grid.copy())
+        frames = engine.frames
+        assert frames.shape[0] == 3
+        expected = ([history[0]] * 3 + history)[-3:]
+        assert np.array_equal(frames, np.stack(expected)), (
+            'Кадры должны идти от старых к новым без копирования кольца.'
+        )
+    assert np.shares_memory(engine.frames, engine.history)
+
+
+def test_frames_are_opt_in(_the_snake, snake_observation):
+    engine = snake_observation.ObservedEngine(seed=2)
+    engine.step()
+    assert engine.history is None and engine.frames is None, (
+        'Без параметра frames шаг не должен копировать поле в историю.'
+    )
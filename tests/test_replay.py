@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.fixture
+def snake_replay(_the_snake):
+    import snake_replay
+    return snake_replay
+
+
+def test_replay_is_deterministic(_the_snake, snake_replay, record_game,
+                                 tmp_path):
+    path = tmp_path / 'game.snkr'
+    states = record_game(path)
+    assert sum(reward == _the_snake.APPLE_REWARD for _, reward, _ in states)
+    with snake_replay.ReplayPlayer(path) as player:
+        assert list(player.play()) == states, (
+            'Воспроизведение должно повторять записанную игру.'
+        )
+
+
+def test_replay_seek(_the_snake, snake_replay, record_game, tmp_path):
+    path = tmp_path / 'game.snkr'
+    states = record_game(path)
+    with snake_replay.ReplayPlayer(path) as player:
+        for tick in (300, 128, 10, 64, 499, *range(0, 500, 37)):
+            engine = player.seek(tick)
+            snake = engine.snake
+            assert set(snake.free_cells) == (
+                set(_the_snake.BOARD.cells()) - set(snake.occupied)
+            ), 'После seek индекс свободных клеток должен совпадать со змейкой.'
+            assert next(player.play(1)) == states[tick]
+            assert engine.snake.length == states[tick][0].length
+
+
+def test_replay_is_compact(snake_replay, record_game, tmp_path):
+    path = tmp_path / 'game.snkr'
+    record_game(path, ticks=4000, interval=4000)
+    snapshot_limit = 2 * (snake_replay.SNAPSHOT.size + 2 * 768)
+    assert path.stat().st_size <= (
+        snake_replay.HEADER.size + 4000 // 4 + snapshot_limit
+    )
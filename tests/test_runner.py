@@ -0,0 +1,29 @@
+import pytest
+
+
+@pytest.fixture
+def snake_runner(_the_snake):
+    import snake_runner
+    return snake_runner
+
+
+def test_play_games_results(snake_runner):
+    results = snake_runner.play_games('greedy', seed=1, games=5)
+    assert len(results) == 5
+    for result in results:
+        assert result.score >= 1
+        assert result.ticks >= 1
+        assert result.cause in (
+            snake_runner.SELF_COLLISION, snake_runner.BOARD_FULL,
+            snake_runner.TIMEOUT,
+        )
+
+
+def test_run_independent_of_workers(snake_runner):
+    kwargs = dict(policy_name='random', games=12, seed=5, chunk_size=4)
+    one = snake_runner.run(workers=1, **kwargs).as_dict()
+    two = snake_runner.run(workers=2, **kwargs).as_dict()
+    assert one == two, (
+        'Итог прогона не должен зависеть от числа процессов.'
+    )
+    assert one['games'] == 12
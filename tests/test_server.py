@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def snake_server(_the_snake):
+    import snake_server
+    return snake_server
+
+
+def server_cells(session, snake_server):
+    """Тело и яблоко сессии в индексах клеток"""
+    board = session.engine.board
+    body = [snake_server.to_index(cell, board)
+            for cell in session.engine.snake.positions]
+    return body, snake_server.to_index(session.engine.apple.position, board)
+
+
+def test_clients_mirror_server_state(_the_snake, snake_server):
+    async def scenario():
+        server = snake_server.GameServer()
+        port = await server.start()
+        clients = [
+            await asyncio.open_connection('127.0.0.1', port)
+            for _ in range(3)
+        ]
+        while len(server.sessions) < len(clients):
+            await asyncio.sleep(0.01)
+        sessions = list(server.sessions)
+        replicas = [snake_server.Replica() for _ in clients]
+        for tick in range(1, 120):
+            if tick % 7 == 0:
+                code = tick // 7 % 4
+                clients[0][1].write(bytes([code]))
+                await clients[0][1].drain()
+                await asyncio.sleep(0.01)
+            server.tick()
+            for (reader, _), replica in zip(clients, replicas):
+                while replica.tick < tick:
+                    replica.feed(await reader.read(4096))
+        for session, replica in zip(sessions, replicas):
+            body, apple = server_cells(session, snake_server)
+            assert list(replica.body) == body, (
+                'Клиент должен восстанавливать тело змейки по изменениям.'
+            )
+            assert replica.apple == apple
+        for _, writer in clients:
+            writer.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_slow_client_gets_snapshot(_the_snake, snake_server):
+    class Transport:
+        size = 0
+
+        def get_write_buffer_size(self):
+            return self.size
+
+    written = []
+    writer = SimpleNamespace(transport=Transport(), write=written.append)
+    session = snake_server.Session(writer, seed=1, buffer_limit=100)
+    session.step()
+    session.step()
+    assert [data[0] for data in written] == [
+        snake_server.SNAPSHOT_TYPE, snake_server.DELTA_TYPE,
+    ]
+    writer.transport.size = 1_000
+    for _ in range(5):
+        session.step()
+    assert len(written) == 2 and session.skipped == 5, (
+        'Медленному клиенту не должны копиться сообщения.'
+    )
+    writer.transport.size = 0
+    session.step()
+    assert written[-1][0] == snake_server.SNAPSHOT_TYPE, (
+        'После пропуска тиков клиент должен получить полное состояние.'
+    )
+    replica = snake_server.Replica()
+    replica.feed(written[-1])
+    assert list(replica.body) == server_cells(session, snake_server)[0]
@@ -0,0 +1,237 @@
+import pytest
+
+
+def test_move_keeps_occupancy_in_sync(_the_snake):
+    snake = _the_snake.Snake()
+    snake.direction = _the_snake.RIGHT
+    snake.length = 5
+    for _ in range(12):
+        snake.move()
+    assert len(snake.positions) == 5
+    assert set(snake.positions) == set(snake.occupied), (
+        'Индекс занятых клеток `occupied` должен совпадать с `positions`.'
+    )
+    assert snake.last not in snake.occupied
+    assert not snake.collided
+
+
+def test_collided_matches_linear_check(_the_snake):
+    snake = _the_snake.Snake()
+    snake.length = 5
+    for direction in (
+        _the_snake.RIGHT, _the_snake.RIGHT, _the_snake.DOWN,
+        _the_snake.LEFT, _the_snake.UP,
+    ):
+        snake.direction = direction
+        snake.move()
+    head = snake.get_head_position
+    assert snake.collided == (head in list(snake.positions)[1:])
+    assert snake.collided
+
+
+def test_reset_clears_occupancy(_the_snake):
+    snake = _the_snake.Snake()
+    snake.length = 3
+    for _ in range(3):
+        snake.move()
+    snake.reset()
+    assert list(snake.positions) == [snake.position]
+    assert snake.occupied == {snake.position: 1}
+
+
+def test_free_cells_track_snake(_the_snake):
+    snake = _the_snake.Snake()
+    snake.direction = _the_snake.DOWN
+    snake.length = 4
+    for _ in range(30):
+        snake.move()
+    expected = set(_the_snake.ALL_CELLS) - set(snake.positions)
+    assert set(snake.free_cells) == expected, (
+        'Индекс `free_cells` должен содержать все клетки вне змейки.'
+    )
+    snake.reset()
+    assert len(snake.free_cells) == len(_the_snake.ALL_CELLS) - 1
+
+
+def test_free_cells_use_four_bytes_per_cell(_the_snake):
+    free_cells = _the_snake.FreeCells(board=_the_snake.Board(2000, 2000))
+    assert free_cells.cells.itemsize == free_cells.index.itemsize == 4, (
+        'Индекс свободных клеток должен занимать 4 байта на клетку.'
+    )
+    free_cells.remove((1999, 1999))
+    assert len(free_cells) == 2000 * 2000 - 1
+
+
+def test_apple_uses_any_free_cell(_the_snake):
+    # Змейка занимает все столбцы и строки, кроме одной свободной клетки
+    occupied = [
+        cell for cell in _the_snake.ALL_CELLS if cell != (0, 0)
+    ]
+    apple = _the_snake.Apple(occupied)
+    assert apple.position == (0, 0)
+
+
+def test_apple_reports_full_board(_the_snake):
+    apple = _the_snake.Apple()
+    free_cells = _the_snake.FreeCells([])
+    with pytest.raises(_the_snake.BoardFullError):
+        apple.randomize_position(free_cells)
+    with pytest.raises(_the_snake.BoardFullError):
+        _the_snake.Apple(free_cells)
+
+
+def test_incremental_draw_is_constant(_the_snake):
+    snake = _the_snake.Snake()
+    snake.direction = _the_snake.RIGHT
+    snake.length = 10
+    for _ in range(10):
+        snake.move()
+    assert len(snake.draw()) == 11, (
+        'Первая отрисовка после создания змейки должна быть полной.'
+    )
+    snake.move()
+    assert len(snake.draw()) == 3, (
+        'Инкрементальная отрисовка должна затрагивать только хвост, '
+        'голову и предыдущую голову.'
+    )
+    snake.reset()
+    assert snake.redraw
+
+
+def test_draw_returns_blits(_the_snake):
+    snake = _the_snake.Snake()
+    apple = _the_snake.Apple()
+    blits = snake.draw() + apple.draw()
+    assert all(
+        isinstance(sprite, _the_snake.pg.Surface) and len(dest) == 2
+        for sprite, dest in blits
+    ), 'Snake.draw и Apple.draw должны возвращать пары для screen.blits.'
+    assert len(_the_snake.get_screen().blits(blits)) == len(blits)
+
+
+def test_last_is_none_when_snake_grows(_the_snake):
+    snake = _the_snake.Snake()
+    snake.move()
+    assert snake.last is not None
+    snake.length += 1
+    snake.move()
+    assert snake.last is None
+
+
+def test_interpolate(_the_snake):
+    assert _the_snake.interpolate((0, 0), (1, 0), 0.5) == (0.5, 0)
+    # Переход через край поля не интерполируется
+    far = (_the_snake.BOARD_WIDTH - 1, 0)
+    assert _the_snake.interpolate(far, (0, 0), 0.5) == (0, 0)
+
+
+def test_draw_interpolated_is_constant(_the_snake):
+    snake = _the_snake.Snake()
+    snake.direction = _the_snake.RIGHT
+    snake.length = 20
+    for _ in range(25):
+        snake.move()
+    snake.draw()
+    assert len(snake.draw_interpolated(0.5)) <= 6, (
+        'Отрисовка с интерполяцией должна затрагивать только клетки '
+        'головы и хвоста.'
+    )
+
+
+def test_draw_interpolated_leaves_no_trail(_the_snake):
+    pg = _the_snake.pg
+    screen = _the_snake.get_screen()
+    screen.fill(_the_snake.BOARD_BACKGROUND_COLOR)
+    snake = _the_snake.Snake()
+    snake.direction = _the_snake.RIGHT
+    snake.length = 5
+    for _ in range(6):
+        snake.move()
+        for alpha in (0, 1 / 3, 2 / 3):
+            screen.blits(snake.draw_interpolated(alpha))
+    body = pg.image.tobytes(_the_snake.get_sprite(snake.body_color), 'RGB')
+    background = pg.image.tobytes(_the_snake.background_sprite(), 'RGB')
+    for cell in _the_snake.BOARD.cells():
+        if cell in snake.smeared:
+            continue
+        rect = pg.Rect(_the_snake.to_pixels(cell), (_the_snake.GRID_SIZE,) * 2)
+        expected = body if snake.is_occupied(cell) else background
+        assert pg.image.tobytes(screen.subsurface(rect), 'RGB') == expected, (
+            f'Клетка {cell} на экране не совпадает с состоянием змейки '
+            'после отрисовки с интерполяцией.'
+        )
+
+
+def test_input_queue_keeps_fast_double_turn(_the_snake):
+    snake = _the_snake.Snake()
+    snake.direction = _the_snake.RIGHT
+    assert snake.queue_direction(_the_snake.UP)
+    assert snake.queue_direction(_the_snake.LEFT), (
+        'Поворот должен сверяться с уже поставленным в очередь направлением.'
+    )
+    assert not snake.queue_direction(_the_snake.RIGHT)
+    snake.update_direction()
+    assert snake.direction == _the_snake.UP
+    assert snake.input_latency is not None
+    snake.update_direction()
+    assert snake.direction == _the_snake.LEFT
+
+
+def test_input_queue_is_bounded(_the_snake):
+    snake = _the_snake.Snake()
+    snake.direction = _the_snake.RIGHT
+    turns = [_the_snake.UP, _the_snake.LEFT, _the_snake.DOWN,
+             _the_snake.RIGHT, _the_snake.UP]
+    accepted = [snake.queue_direction(turn) for turn in turns]
+    assert sum(accepted) == _the_snake.INPUT_QUEUE_SIZE
+    snake.reset()
+    assert not snake.input_queue
+
+
+def test_sprites_are_cached(_the_snake):
+    sprite = _the_snake.get_sprite(_the_snake.SNAKE_COLOR)
+    assert sprite is _the_snake.get_sprite(_the_snake.SNAKE_COLOR), (
+        'Клетка одного цвета должна отрисовываться один раз.'
+    )
+    assert sprite.get_size() == (_the_snake.GRID_SIZE, _the_snake.GRID_SIZE)
+    assert sprite.get_at((0, 0))[:3] == _the_snake.BORDER_COLOR
+    assert sprite.get_at((5, 5))[:3] == _the_snake.SNAKE_COLOR
+
+
+def test_big_board_wraps_in_cells(_the_snake):
+    board = _the_snake.Board(2000, 2000)
+    snake = _the_snake.Snake(board=board)
+    assert snake.get_head_position == (1000, 1000)
+    snake.direction = _the_snake.LEFT
+    for _ in range(1001):
+        snake.move()
+    assert snake.get_head_position == (1999, 1000), (
+        'Змейка должна переходить через край поля в клетках поля, '
+        'а не экрана.'
+    )
+
+
+def test_chunk_spans_wrap(_the_snake):
+    spans = _the_snake.chunk_spans(35, 10, 40, 16)
+    assert spans == [(2, 3, 0, 5), (0, 0, 5, 5)], (
+        'Окно камеры должно переходить через край поля.'
+    )
+
+
+def test_chunk_renderer_caches_visible_chunks(_the_snake):
+    board = _the_snake.Board(2000, 2000)
+    snake = _the_snake.Snake(board=board)
+    apple = _the_snake.Apple(snake.free_cells, board=board)
+    renderer = _the_snake.ChunkRenderer(board)
+    renderer.draw(snake, apple)
+    cached = dict(renderer.chunks)
+    assert len(cached) <= renderer.capacity
+    snake.move()
+    renderer.draw(snake, apple)
+    reused = sum(
+        renderer.chunks.get(key) is surface for key, surface in cached.items()
+    )
+    assert reused >= len(cached) - 4, (
+        'После хода змейки должны перерисовываться только чанки '
+        'с изменившимися клетками.'
+    )
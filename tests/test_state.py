@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+
+@pytest.fixture
+def snake_state(_the_snake):
+    import snake_state
+    return snake_state
+
+
+def snapshot(state):
+    """Живая часть состояния, по которой сравниваются копии"""
+    body = [
+        state.body[(state.head_ptr - i) % state.capacity]
+        for i in range(state.count)
+    ]
+    return (body, bytes(state.grid), state.length, state.direction,
+            state.apple, state.done)
+
+
+def test_state_follows_engine(_the_snake, snake_state):
+    engine = _the_snake.GameEngine(seed=4)
+    state = snake_state.CompactState.from_engine(engine)
+    width = engine.board.width
+    rng = random.Random(0)
+    choices = (_the_snake.UP, _the_snake.DOWN, _the_snake.LEFT,
+               _the_snake.RIGHT, None, None)
+    for _ in range(3_000):
+        action = rng.choice(choices)
+        _, reward, done = engine.step(action)
+        assert state.apply(action) == (reward, done), (
+            'Награды CompactState должны совпадать с GameEngine.step.'
+        )
+        if done:
+            engine.reset()
+            state = snake_state.CompactState.from_engine(engine)
+            continue
+        x, y = engine.snake.get_head_position
+        assert state.head == y * width + x
+        assert state.length == engine.snake.length
+        if reward:
+            apple_x, apple_y = engine.apple.position
+            state.place_apple(apple_y * width + apple_x)
+
+
+def test_undo_restores_state(_the_snake, snake_state):
+    engine = _the_snake.GameEngine(seed=1)
+    state = snake_state.CompactState.from_engine(engine)
+    rng = random.Random(2)
+    saved = []
+    for _ in range(200):
+        saved.append(snapshot(state))
+        _, done = state.apply(rng.choice(_the_snake.DIRECTIONS))
+        if state.apple == snake_state.NO_APPLE:
+            state.spawn_apple(rng)
+        if done:
+            break
+    while saved:
+        state.undo()
+        assert snapshot(state) == saved.pop(), (
+            'undo должен восстанавливать состояние перед ходом.'
+        )
+
+
+def test_full_board_matches_engine(_the_snake, snake_state):
+    board = _the_snake.Board(2, 1)
+    engine = _the_snake.GameEngine(seed=0, board=board)
+    engine.snake.direction = _the_snake.RIGHT
+    engine.step()
+    state = snake_state.CompactState.from_engine(engine)
+    before = snapshot(state)
+    _, reward, done = engine.step()
+    assert state.apply(None) == (reward, done) == (
+        _the_snake.APPLE_REWARD, True
+    )
+    assert state.length == engine.snake.length == board.size
+    state.undo()
+    assert snapshot(state) == before
+
+
+def test_clone_is_independent(_the_snake, snake_state):
+    state = snake_state.CompactState.from_engine(
+        _the_snake.GameEngine(seed=3)
+    )
+    before = snapshot(state)
+    copy = state.clone()
+    for _ in range(10):
+        copy.apply(_the_snake.UP)
+    assert snapshot(state) == before
+    assert snapshot(copy) != before
@@ -0,0 +1,86 @@
+import json
+import random
+import statistics
+
+import pytest
+
+
+@pytest.fixture
+def snake_stats(_the_snake):
+    import snake_stats
+    return snake_stats
+
+
+def test_running_moments_merge(snake_stats):
+    values = [random.Random(i).gauss(10, 3) for i in range(1000)]
+    left = snake_stats.RunningMoments()
+    right = snake_stats.RunningMoments()
+    for value in values[:300]:
+        left.add(value)
+    for value in values[300:]:
+        right.add(value)
+    merged = left.merge(right)
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(statistics.fmean(values))
+    assert merged.variance == pytest.approx(statistics.variance(values)), (
+        'Объединение оценок Уэлфорда должно давать дисперсию всего потока.'
+    )
+    assert (merged.low, merged.high) == (min(values), max(values))
+
+
+def test_histogram_quantile_and_merge(snake_stats):
+    left = snake_stats.Histogram(0, 100, 100)
+    right = snake_stats.Histogram(0, 100, 100)
+    for value in range(50):
+        left.add(value)
+    for value in range(50, 100):
+        right.add(value)
+    right.add(-1)
+    right.add(100)
+    merged = left.merge(right)
+    assert merged.count == 102
+    assert (merged.under, merged.over) == (1, 1)
+    assert merged.quantile(0.5) == pytest.approx(50, abs=1)
+    with pytest.raises(ValueError):
+        merged.merge(snake_stats.Histogram(0, 10, 100))
+
+
+def test_p2_quantile_accuracy(snake_stats):
+    rng = random.Random(7)
+    values = [rng.expovariate(1) for _ in range(20_000)]
+    estimate = snake_stats.P2Quantile(0.9)
+    for value in values:
+        estimate.add(value)
+    exact = sorted(values)[int(0.9 * len(values))]
+    assert estimate.value == pytest.approx(exact, rel=0.05), (
+        'Оценка P² должна быть близка к точному квантилю.'
+    )
+    halves = [snake_stats.P2Quantile(0.9) for _ in range(2)]
+    for i, value in enumerate(values):
+        halves[i % 2].add(value)
+    merged = halves[0].merge(halves[1])
+    assert merged.count == len(values)
+    assert merged.value == pytest.approx(exact, rel=0.1)
+
+
+def test_game_stats_log_round_trip(snake_stats, tmp_path):
+    import snake_runner
+    stats = snake_runner.play_games_stats('greedy', seed=1, games=4)
+    other = snake_runner.play_games_stats('greedy', seed=2, games=4)
+    assert stats.games == 4
+    eaten = round(stats.score.moments.mean * stats.games) - stats.games
+    assert stats.apple_wait.moments.count == eaten, (
+        'Каждое съеденное яблоко должно давать одно время ожидания.'
+    )
+    stats.merge(other)
+    path = tmp_path / 'stats.jsonl'
+    log = snake_stats.StatsLog(path, interval=3600)
+    assert log.flush(stats)
+    assert not log.flush(stats), 'Запись чаще interval должна пропускаться.'
+    assert log.flush(stats, force=True)
+    assert len(path.read_text().splitlines()) == 2
+    restored = snake_stats.read_last(path)
+    assert json.dumps(restored.as_dict()) == json.dumps(stats.as_dict()), (
+        'Статистика должна восстанавливаться из последней строки журнала.'
+    )
+    assert sum(restored.causes.values()) == 8
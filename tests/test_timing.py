@@ -0,0 +1,63 @@
+import csv
+import json
+
+import pygame
+import pytest
+
+
+@pytest.fixture
+def snake_timing(_the_snake):
+    import snake_timing
+    return snake_timing
+
+
+def _record(timer, frames, snake_timing):
+    for _ in range(frames):
+        timer.start_frame()
+        for phase in range(len(snake_timing.PHASES)):
+            timer.mark(phase)
+
+
+def test_ring_buffer_keeps_last_frames(snake_timing):
+    timer = snake_timing.FrameTimer(capacity=8)
+    _record(timer, 20, snake_timing)
+    rows = timer.rows()
+    assert len(rows) == 8
+    starts = [row[0] for row in rows]
+    assert starts == sorted(starts), (
+        'Строки буфера должны идти от старых кадров к новым.'
+    )
+    stats = timer.stats()
+    for key in ('fps', 'p50', 'p99') + snake_timing.PHASES:
+        assert key in stats
+
+
+def test_disabled_timer_records_nothing(snake_timing):
+    timer = snake_timing.FrameTimer(enabled=False)
+    _record(timer, 5, snake_timing)
+    assert timer.frames == 0
+    assert timer.rows() == []
+
+
+@pytest.mark.parametrize('suffix', ('.csv', '.json'))
+def test_export(snake_timing, tmp_path, suffix):
+    timer = snake_timing.FrameTimer(capacity=4)
+    _record(timer, 6, snake_timing)
+    path = tmp_path / f'timings{suffix}'
+    timer.export(path)
+    if suffix == '.json':
+        data = json.loads(path.read_text())
+        assert len(data['rows']) == 4
+    else:
+        with path.open() as file:
+            rows = list(csv.reader(file))
+        assert rows[0] == ['start', *snake_timing.PHASES]
+        assert len(rows) == 5
+
+
+def test_draw_hud(_the_snake, snake_timing):
+    pygame.init()
+    timer = snake_timing.FrameTimer()
+    _record(timer, 3, snake_timing)
+    rect = timer.draw_hud(_the_snake.get_screen())
+    assert rect.width > 0 and rect.height > 0
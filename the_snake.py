@@ -1,25 +1,60 @@
-from random import choice
+import random
+import sys
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from importlib.util import LazyLoader, find_spec, module_from_spec
+from itertools import islice
+from time import perf_counter, sleep
 
-import pygame as pg
+from snake_timing import DISPLAY, DRAW, INPUT, LOGIC, FrameTimer
 
 
+def lazy_import(name):
+    """
+    Импортирует модуль отложенно: код модуля выполняется при первом
+    обращении к его атрибуту. Если модуль уже загружен, возвращает его.
+    :return: модуль
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = find_spec(name)
+    loader = LazyLoader(spec.loader)
+    spec.loader = loader
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# pygame загружается при первой отрисовке или опросе событий, поэтому
+# правила Snake/Apple и GameEngine импортируются без SDL и видеоустройства
+pg = lazy_import('pygame')
+
 # Константы для размеров поля и сетки:
 SCREEN_WIDTH, SCREEN_HEIGHT = 640, 480
 GRID_SIZE = 20
 GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
 
-# Константы с коодинатами ячеек по x и y
-COORDINATES_X = [i * GRID_SIZE for i in range(0, GRID_WIDTH)]
-COORDINATES_Y = [i * GRID_SIZE for i in range(0, GRID_HEIGHT)]
-# Центр игрового поля
-CENTER_FIELD = ((SCREEN_WIDTH // 2), (SCREEN_HEIGHT // 2))
+# Размер логического игрового поля в клетках. Поле может быть больше
+# экрана: тогда камера следует за головой змейки
+BOARD_WIDTH = GRID_WIDTH
+BOARD_HEIGHT = GRID_HEIGHT
+# Сторона квадратного чанка поля в клетках для отрисовки больших полей
+CHUNK_SIZE = 16
 
 # Направления движения:
 UP = (0, -1)
 DOWN = (0, 1)
 LEFT = (-1, 0)
 RIGHT = (1, 0)
+# Коды направлений — индексы в DIRECTIONS; противоположное направление
+# имеет код (код + 2) % 4
+DIRECTIONS = (UP, RIGHT, DOWN, LEFT)
+
+# Клавиши управления и соответствующие им направления. Коды клавиш
+# берутся из pygame, поэтому словарь заполняет key_directions
+KEY_DIRECTIONS = {}
 
 # Цвет фона - черный:
 BOARD_BACKGROUND_COLOR = (0, 0, 0)
@@ -33,20 +68,245 @@ APPLE_COLOR = (255, 0, 0)
 # Цвет змейки
 SNAKE_COLOR = (0, 255, 0)
 
+# Цвет головы змейки
+SNAKE_HEAD_COLOR = SNAKE_COLOR
+
 # Скорость движения змейки:
 SPEED = 20
 
-# Настройка игрового окна:
-screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), 0, 32)
+# Сколько нажатий клавиш змейка запоминает между ходами
+INPUT_QUEUE_SIZE = 3
+
+# Инкрементальная отрисовка: перерисовываются только изменившиеся клетки
+INCREMENTAL_RENDER = True
+
+# Замер времени фаз каждого тика, оверлей со статистикой и файл (.csv или
+# .json), в который замеры сохраняются при выходе из игры
+PROFILE_ENABLED = False
+PROFILE_HUD = False
+PROFILE_EXPORT_PATH = None
+
+# Файл, в который записывается игра для воспроизведения (snake_replay)
+REPLAY_PATH = None
+
+# Автопилот вместо клавиатуры (snake_autopilot): None, 'bfs'
+# или 'hamiltonian'
+AUTOPILOT = None
+
+# Режим фиксированного шага логики: змейка двигается LOGIC_RATE раз
+# в секунду, а кадры рисуются с частотой RENDER_RATE с интерполяцией
+FIXED_TIMESTEP = False
+LOGIC_RATE = SPEED
+RENDER_RATE = 60
+# Максимальное время кадра, учитываемое аккумулятором (защита от лавины
+# догоняющих шагов после зависания)
+MAX_FRAME_TIME = 0.25
+# За сколько секунд до дедлайна кадра sleep сменяется активным ожиданием
+SPIN_THRESHOLD = 0.002
+
+
+class Board(namedtuple('Board', 'width height')):
+    """Размер логического игрового поля в клетках.
+    Позиции на поле — координаты клеток (x, y), индекс клетки —
+    y * width + x.
+    """
+
+    __slots__ = ()
+
+    @property
+    def center(self) -> tuple[int, int]:
+        """Центральная клетка поля"""
+        return (self.width // 2, self.height // 2)
+
+    @property
+    def size(self) -> int:
+        """Количество клеток поля"""
+        return self.width * self.height
+
+    def cells(self) -> list:
+        """Координаты всех клеток поля по строкам"""
+        return [(x, y) for y in range(self.height) for x in range(self.width)]
+
+    def fits_screen(self) -> bool:
+        """Помещается ли поле на экран целиком"""
+        return self.width <= GRID_WIDTH and self.height <= GRID_HEIGHT
+
+
+# Игровое поле по умолчанию
+BOARD = Board(BOARD_WIDTH, BOARD_HEIGHT)
+# Координаты всех клеток игрового поля
+ALL_CELLS = BOARD.cells()
+# Центр игрового поля
+CENTER_FIELD = BOARD.center
+
+# Награды headless-движка за шаг:
+APPLE_REWARD = 1
+DEATH_REWARD = -1
+
+# Состояние игры, которое возвращает GameEngine.step
+GameState = namedtuple('GameState', 'head direction length apple')
+
+
+def init_display():
+    """
+    Создает игровое окно, заголовок и часы. Окно открывается только при
+    первой отрисовке, поэтому импорт модуля не инициализирует дисплей.
+    :return: screen
+    """
+    global screen, clock
+    if 'screen' not in globals():
+        # Настройка игрового окна:
+        screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), 0, 32)
+        # Заголовок окна игрового поля:
+        pg.display.set_caption('Змейка')
+        # Настройка времени:
+        clock = pg.time.Clock()
+    return screen
+
+
+def get_screen():
+    """Возвращает игровое окно, создавая его при первом обращении"""
+    if 'screen' not in globals():
+        init_display()
+    return screen
+
+
+def key_directions():
+    """Возвращает KEY_DIRECTIONS, заполняя его при первом обращении"""
+    if not KEY_DIRECTIONS:
+        KEY_DIRECTIONS.update({
+            pg.K_UP: UP,
+            pg.K_DOWN: DOWN,
+            pg.K_LEFT: LEFT,
+            pg.K_RIGHT: RIGHT,
+        })
+    return KEY_DIRECTIONS
+
+
+def get_clock():
+    """Возвращает часы игры, создавая окно при первом обращении"""
+    if 'clock' not in globals():
+        init_display()
+    return clock
+
+
+# Кэш заранее отрисованных клеток: (цвет, есть ли рамка) -> pg.Surface
+SPRITES = {}
 
-# Заголовок окна игрового поля:
-pg.display.set_caption('Змейка')
 
-# Настройка времени:
-clock = pg.time.Clock()
+def get_sprite(color, border=True):
+    """
+    Возвращает заранее отрисованную клетку размера GRID_SIZE.
+    Клетка создается один раз в формате экрана (convert), поэтому ее
+    копирование через blit дешевле двух вызовов pg.draw.rect.
+    :color: Цвет заливки
+    :border: Рисовать ли рамку BORDER_COLOR
+    :return: pg.Surface
+    """
+    sprite = SPRITES.get((color, border))
+    if sprite is None:
+        sprite = pg.Surface((GRID_SIZE, GRID_SIZE)).convert(get_screen())
+        sprite.fill(color)
+        if border:
+            pg.draw.rect(sprite, BORDER_COLOR, sprite.get_rect(), 1)
+        SPRITES[(color, border)] = sprite
+    return sprite
+
+
+def to_pixels(cell):
+    """Переводит координаты клетки в координаты на экране в пикселях"""
+    return (cell[0] * GRID_SIZE, cell[1] * GRID_SIZE)
+
+
+def background_sprite():
+    """Клетка фона без рамки для затирания следа"""
+    return get_sprite(BOARD_BACKGROUND_COLOR, border=False)
+
+
+def __getattr__(name):
+    """Лениво создает screen и clock при обращении the_snake.screen"""
+    if name in ('screen', 'clock'):
+        init_display()
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 # Тут опишите все классы игры.
+class BoardFullError(Exception):
+    """Исключение: на игровом поле не осталось свободных клеток"""
+
+
+class FreeCells:
+    """
+    FreeCells хранит множество свободных клеток игрового поля.
+    Индексы клеток лежат в массиве cells: первые size элементов — свободные
+    клетки, остальные — занятые. Массив index хранит позицию каждой клетки
+    в cells. Занятие и освобождение клетки — обмен двух элементов на
+    границе size, поэтому add, remove и sample работают за O(1), а память
+    на поле 2000x2000 — два массива по 4 байта на клетку.
+    """
+
+    def __init__(self, cells=None, board=BOARD):
+        """
+        :cells: Начальный набор свободных клеток, по умолчанию всё поле
+        :board: Игровое поле
+        """
+        self.board = board
+        self.cells = array('i', range(board.size))
+        self.index = array('i', self.cells)
+        self.size = board.size
+        if cells is not None:
+            self.size = 0
+            for cell in cells:
+                self.add(cell)
+
+    def __len__(self):
+        """Количество свободных клеток"""
+        return self.size
+
+    def __contains__(self, cell):
+        """Проверяет, свободна ли клетка, за O(1)"""
+        return self.index[cell[1] * self.board.width + cell[0]] < self.size
+
+    def __iter__(self):
+        """Перебирает координаты свободных клеток"""
+        width = self.board.width
+        for i in range(self.size):
+            yield (self.cells[i] % width, self.cells[i] // width)
+
+    def _swap(self, i, j):
+        """Меняет местами клетки на позициях i и j массива cells"""
+        first, second = self.cells[i], self.cells[j]
+        self.cells[i], self.cells[j] = second, first
+        self.index[first], self.index[second] = j, i
+
+    def add(self, cell):
+        """Помечает клетку свободной"""
+        i = self.index[cell[1] * self.board.width + cell[0]]
+        if i >= self.size:
+            self._swap(i, self.size)
+            self.size += 1
+
+    def remove(self, cell):
+        """Помечает клетку занятой: подменяет её последней свободной"""
+        i = self.index[cell[1] * self.board.width + cell[0]]
+        if i < self.size:
+            self.size -= 1
+            self._swap(i, self.size)
+
+    def sample(self, rng=random):
+        """
+        Возвращает случайную свободную клетку с равной вероятностью
+        :rng: Источник случайных чисел, по умолчанию модуль random
+        :raises BoardFullError: если свободных клеток не осталось
+        :return: tuple[int, int]
+        """
+        if not self.size:
+            raise BoardFullError('На игровом поле нет свободных клеток')
+        cell = self.cells[rng.randrange(self.size)]
+        return (cell % self.board.width, cell // self.board.width)
+
+
 class GameObject:
     """GameObject является родительским классом для Apple и Snake"""
 
@@ -57,45 +317,63 @@ class GameObject:
     def draw(self):
         """Метод draw будет переопределен  в дочерних классах"""
 
+    def draw_cell(self, position, color=None):
+        """
+        Готовит отрисовку одной клетки игрового поля с рамкой
+        :position: Координаты клетки
+        :color: Цвет заливки, по умолчанию body_color
+        :return: пара (спрайт, координаты в пикселях) для screen.blits
+        """
+        return get_sprite(color or self.body_color), to_pixels(position)
+
 
 class Apple(GameObject):
     """Apple наследуется от класса GameObject и нужен для создания и отрисовки
     яблока на игровом поле
     """
 
-    def __init__(self, occupied_cells=None):
+    def __init__(self, occupied_cells=None, rng=random, board=BOARD):
         """Инициализирует объект apple = Apple()
-        :occupied_cells: Принемает на вход список с координатами всех сегментов
-        змейки. Координаты по умолчанию это координаты появления змейки
+        :occupied_cells: Принемает на вход индекс свободных клеток FreeCells
+        или список с координатами всех сегментов змейки. Координаты
+        по умолчанию это координаты появления змейки
+        :rng:  Источник случайных чисел (random.Random или модуль random)
+        :board:  Игровое поле
         :body_color:  Цвет яблока
         :position:  Рандомная позиция яблока на игровом поле
+        :raises BoardFullError: если свободных клеток не осталось
         """
         super().__init__()
+        self.rng = rng
+        self.board = board
         self.body_color = APPLE_COLOR
-        self.position = occupied_cells
-        if self.position:
-            self.randomize_position(occupied_cells)
-        else:
-            self.randomize_position([CENTER_FIELD])
+        if occupied_cells is None:
+            occupied_cells = [board.center]
+        self.randomize_position(occupied_cells)
 
     def randomize_position(self, occupied_cells):
         """
         randomize_position генерирует рандомные координаты для  Apple
         на игровом поле
-        :occupied_cells: Принимает на вход список позиции змейки
+        :occupied_cells: Принимает на вход индекс свободных клеток FreeCells
+        (выбор за O(1)) или список позиции змейки (индекс строится заново)
+        :raises BoardFullError: если свободных клеток не осталось
         :return: tuple[int, int]
         """
-        dx = list(set(COORDINATES_X) - set([i[0] for i in occupied_cells]))
-        dy = list(set(COORDINATES_Y) - set([i[1] for i in occupied_cells]))
-        self.position = (
-            choice(dx),
-            choice(dy))
-
-    def draw(self) -> None:
-        """Метод draw отрисовывает Apple на игровом поле"""
-        rect = pg.Rect(self.position, (GRID_SIZE, GRID_SIZE))
-        pg.draw.rect(screen, self.body_color, rect)
-        pg.draw.rect(screen, BORDER_COLOR, rect, 1)
+        if not isinstance(occupied_cells, FreeCells):
+            free_cells = FreeCells(board=self.board)
+            for cell in set(occupied_cells):
+                free_cells.remove(cell)
+            occupied_cells = free_cells
+        self.position = occupied_cells.sample(self.rng)
+        return self.position
+
+    def draw(self) -> list:
+        """
+        Метод draw готовит отрисовку Apple на игровом поле
+        :return: список пар (спрайт, координаты) для screen.blits
+        """
+        return [self.draw_cell(self.position)]
 
 
 class Snake(GameObject):
@@ -105,8 +383,9 @@ class Snake(GameObject):
     :метод: update_direction — обновляет направление движения змейки
     (есть в прекоде).
     :метод: move — обновляет позицию змейки (координаты каждой секции),
-    добавляя новую голову в начало списка positions и удаляя последний
-    элемент, если длина змейки не увеличилась.
+    добавляя новую голову в начало очереди positions и удаляя последний
+    элемент, если длина змейки не увеличилась. Удаленный элемент
+    сохраняется в last (None, если змейка выросла).
     :метод: draw — отрисовывает змейку на экране, затирая след
     (есть в прекоде).
     :свойство: get_head_position — возвращает позицию головы змейки
@@ -114,49 +393,159 @@ class Snake(GameObject):
     :метод: reset — сбрасывает змейку в начальное состояние.
     """
 
-    def __init__(self):
+    def __init__(self, rng=random, board=BOARD, free_cells=None,
+                 position=None):
         """
         __init__ — инициализирует начальное состояние змейки.
+        :rng:  Источник случайных чисел (random.Random или модуль random).
+        :board:  Игровое поле.
+        :position:  Клетка появления змейки, по умолчанию центр поля.
         :length:  Длина змейки. Изначально змейка имеет длину 1.
-        :positions:  Список, содержащий позиции всех сегментов тела
-          змейки. Начальная позиция — центр экрана.
+        :positions:  Очередь (deque), содержащая координаты клеток всех
+          сегментов тела змейки. Начальная позиция — position.
+        :occupied:  Словарь занятости клеток: позиция -> число сегментов
+          в ней. Позволяет проверять столкновения за O(1).
+        :free_cells:  Индекс свободных клеток FreeCells, который move
+          обновляет инкрементально. Нужен для появления яблока за O(1).
+          Можно передать общий индекс нескольких змеек.
+        :redraw:  Флаг полной перерисовки змейки при следующем draw.
+        :smeared:  Клетки, задетые сдвинутыми спрайтами draw_interpolated
+          в прошлом кадре.
+        :input_queue:  Очередь нажатых направлений с отметками времени,
+          по одному направлению на ход. Не больше INPUT_QUEUE_SIZE.
+        :input_latency:  Время в секундах от нажатия клавиши до хода,
+          в котором было применено последнее направление из очереди.
         :direction:  Направление движения змейки. По умолчанию змейка
           движется вправо.
         :next_direction:  Следующее направление движения, которое будет
           применено после обработки нажатия клавиши. По умолчанию задать None.
         :body_color:  Цвет змейки. Задаётся RGB-значением
           (по умолчанию — зелёный: (0, 255, 0)).
+        :head_color:  Цвет головы змейки.
         """
         super().__init__()
+        self.rng = rng
+        self.board = board
+        self.position = board.center if position is None else position
         self.length = 1
-        self.positions = [self.position]
+        self.positions = deque([self.position])
+        self.occupied = {self.position: 1}
+        if free_cells is None:
+            free_cells = FreeCells(board=board)
+        self.free_cells = free_cells
+        self.free_cells.remove(self.position)
         self.direction = LEFT
         self.next_direction = None
+        self.input_queue = deque(maxlen=INPUT_QUEUE_SIZE)
+        self.input_latency = None
         self.body_color = SNAKE_COLOR
+        self.head_color = SNAKE_HEAD_COLOR
         self.last = None
+        self.redraw = True
+        self.smeared = []
 
     # Метод обновления направления после нажатия на кнопку
     def update_direction(self):
-        """Метод обновления направления после нажатия на кнопку"""
+        """Метод обновления направления после нажатия на кнопку.
+        Явно заданное next_direction имеет приоритет, иначе из очереди
+        input_queue берется одно направление на ход.
+        """
         if self.next_direction:
             self.direction = self.next_direction
             self.next_direction = None
+        elif self.input_queue:
+            self.direction, timestamp = self.input_queue.popleft()
+            self.input_latency = perf_counter() - timestamp
 
-    def draw(self):
-        """Метод отрисовки змейки на игровом поле"""
-        for position in self.positions[:-1]:
-            rect = (pg.Rect(position, (GRID_SIZE, GRID_SIZE)))
-            pg.draw.rect(screen, self.body_color, rect)
-            pg.draw.rect(screen, BORDER_COLOR, rect, 1)
-        # Отрисовка головы змейки
-        head_rect = pg.Rect(self.get_head_position, (GRID_SIZE, GRID_SIZE))
-        pg.draw.rect(screen, self.body_color, head_rect)
-        pg.draw.rect(screen, BORDER_COLOR, head_rect, 1)
-
+    def queue_direction(self, direction, timestamp=None):
+        """
+        Добавляет нажатое направление в очередь input_queue.
+        Направление сверяется с последним направлением в очереди (или
+        текущим, если очередь пуста): повтор и разворот отбрасываются,
+        как и нажатия сверх INPUT_QUEUE_SIZE.
+        :direction: UP, DOWN, LEFT или RIGHT
+        :timestamp: Время нажатия по perf_counter, по умолчанию — сейчас
+        :return: True, если направление добавлено в очередь
+        """
+        if len(self.input_queue) == self.input_queue.maxlen:
+            return False
+        previous = (
+            self.input_queue[-1][0] if self.input_queue else self.direction
+        )
+        if direction == previous or (-direction[0], -direction[1]) == previous:
+            return False
+        if timestamp is None:
+            timestamp = perf_counter()
+        self.input_queue.append((direction, timestamp))
+        return True
+
+    def draw(self) -> list:
+        """
+        Метод отрисовки змейки на игровом поле.
+        В инкрементальном режиме затирается хвост last и рисуются только
+        голова и предыдущая голова, поэтому стоимость кадра не зависит
+        от длины змейки. Полная перерисовка выполняется после reset()
+        или если INCREMENTAL_RENDER выключен. Сам blit выполняет
+        render_frame одним вызовом screen.blits для всего кадра.
+        :return: список пар (спрайт, координаты) для screen.blits
+        """
+        body = get_sprite(self.body_color)
+        blits = []
         # Затирание последнего сегмента
-        if self.last:
-            last_rect = pg.Rect(self.last, (GRID_SIZE, GRID_SIZE))
-            pg.draw.rect(screen, BOARD_BACKGROUND_COLOR, last_rect)
+        if self.last is not None:
+            blits.append((background_sprite(), to_pixels(self.last)))
+        if self.redraw or not INCREMENTAL_RENDER:
+            segments = islice(self.positions, 1, None)
+            self.redraw = False
+        else:
+            segments = islice(self.positions, 1, 2)
+        blits.extend((body, to_pixels(position)) for position in segments)
+        blits.append(
+            (get_sprite(self.head_color), to_pixels(self.positions[0]))
+        )
+        return blits
+
+    def draw_interpolated(self, alpha) -> list:
+        """
+        Отрисовка змейки между клетками для режима FIXED_TIMESTEP.
+        Голова сдвинута от предыдущей клетки к текущей, а хвост — от
+        затертой клетки last к последнему сегменту на долю alpha шага.
+        Сдвинутые спрайты заходят на соседние клетки, поэтому клетки,
+        задетые в прошлом кадре (smeared), перерисовываются по текущему
+        состоянию змейки. Перерисовываются только клетки головы и хвоста.
+        :alpha: Доля прошедшего логического шага от 0 до 1
+        :return: список пар (спрайт, координаты) для screen.blits
+        """
+        redraw = self.draw() if self.redraw else []
+        body = get_sprite(self.body_color)
+        background = background_sprite()
+        head = self.positions[0]
+        tail = self.positions[-1]
+        previous = self.positions[1] if len(self.positions) > 1 else None
+        current = (self.last, head, previous, tail)
+        blits = redraw + [
+            (body if cell in self.occupied else background, to_pixels(cell))
+            for cell in self.smeared if cell not in current
+        ]
+        blits += [
+            (background, to_pixels(cell)) for cell in (self.last, head)
+            if cell is not None
+        ]
+        if previous is not None:
+            blits += [(body, to_pixels(previous)), (body, to_pixels(tail))]
+            if self.last is not None:
+                blits.append(
+                    (body, to_pixels(interpolate(self.last, tail, alpha)))
+                )
+        start = next(
+            cell for cell in (previous, self.last, head) if cell is not None
+        )
+        blits.append((
+            get_sprite(self.head_color),
+            to_pixels(interpolate(start, head, alpha)),
+        ))
+        self.smeared = [cell for cell in current if cell is not None]
+        return blits
 
     @property
     def get_head_position(self) -> tuple[int, int]:
@@ -170,84 +559,464 @@ class Snake(GameObject):
 
     def move(self):
         """Метод для просчета движения змейки по игровому полю
-        :head_x: Координаты головы по оси SCREEN_WIDTH
-        :head_y: Координаты головы по оси SCREEN_HEIGHT
-        :direction_x: Напровление движения по оси SCREEN_WIDTH
-        :direction_y: Напровление движения по оси SCREEN_HEIGHT
+        :head_x: Координата клетки головы по ширине поля
+        :head_y: Координата клетки головы по высоте поля
+        :direction_x: Напровление движения по ширине поля
+        :direction_y: Напровление движения по высоте поля
         :Переменные: dx и dy используются для временного хранения координат
-        по осям SCREEN_WIDTH и SCREEN_HEIGHT
+        новой головы с переносом через край поля
         """
         head_x, head_y = self.get_head_position
         direction_x, direction_y = self.direction
-        dx = (head_x + (direction_x * GRID_SIZE)) % SCREEN_WIDTH
-        dy = (head_y + (direction_y * GRID_SIZE)) % SCREEN_HEIGHT
-        self.positions.insert(0, (dx, dy))
-        if self.length < len(self.positions):
-            self.last = self.positions.pop()
+        dx = (head_x + direction_x) % self.board.width
+        dy = (head_y + direction_y) % self.board.height
+        self.positions.appendleft((dx, dy))
+        if (dx, dy) in self.occupied:
+            self.occupied[(dx, dy)] += 1
+        else:
+            self.occupied[(dx, dy)] = 1
+            self.free_cells.remove((dx, dy))
+        if self.length >= len(self.positions):
+            # Змейка выросла: хвост остался на месте
+            self.last = None
+            return
+        self.last = self.positions.pop()
+        if self.occupied[self.last] == 1:
+            del self.occupied[self.last]
+            self.free_cells.add(self.last)
+        else:
+            self.occupied[self.last] -= 1
+
+    def is_occupied(self, position) -> bool:
+        """Проверяет, занята ли клетка сегментом змейки, за O(1)
+        :position: Координаты клетки
+        :return: bool
+        """
+        return position in self.occupied
+
+    @property
+    def collided(self) -> bool:
+        """
+        Свойство показывает, врезалась ли голова змейки в собственное тело.
+        Заменяет линейную проверку head in positions[1:].
+
+        :return: True, если клетку головы занимает ещё один сегмент
+        :rtype: bool:
+        """
+        return self.occupied[self.get_head_position] > 1
 
     def reset(self):
         """Возвращаем змейку к изначальному состоянию.
         :next_direction: Задаем рандомное напровление движения.
         """
+        for cell in self.occupied:
+            self.free_cells.add(cell)
+        self.free_cells.remove(self.position)
         self.length = 1
-        self.positions = [self.position]
-        self.next_direction = choice((LEFT, RIGHT, UP, DOWN))
+        self.positions = deque([self.position])
+        self.occupied = {self.position: 1}
+        self.input_queue.clear()
+        self.next_direction = self.rng.choice((LEFT, RIGHT, UP, DOWN))
         self.update_direction()
         self.last = None
+        self.redraw = True
+
+
+class GameEngine:
+    """
+    GameEngine — headless-движок игры, не зависящий от дисплея и pygame
+    событий. Владеет объектами Snake и Apple и продвигает игру по одному
+    шагу за вызов step, что позволяет прогонять миллионы игр без окна.
+    :метод: reset — начинает новую игру (опционально с заданным seed).
+    :метод: step — выполняет один тик и возвращает (state, reward, done).
+    """
+
+    def __init__(self, seed=None, board=BOARD):
+        """
+        :rng:  Собственный генератор случайных чисел движка.
+        :board:  Игровое поле.
+        :snake:  Объект Snake.
+        :apple:  Объект Apple.
+        :ticks:  Количество тиков с начала текущей игры.
+        """
+        self.rng = random.Random(seed)
+        self.board = board
+        self.snake = Snake(self.rng, board)
+        self.apple = Apple(self.snake.free_cells, self.rng, board)
+        self.ticks = 0
+
+    @property
+    def state(self) -> GameState:
+        """Текущее состояние игры"""
+        return GameState(
+            self.snake.get_head_position, self.snake.direction,
+            self.snake.length, self.apple.position,
+        )
+
+    def reset(self, seed=None) -> GameState:
+        """
+        Начинает новую игру
+        :seed: Зерно генератора; None — продолжить текущую последовательность
+        :return: GameState
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+        self.snake.reset()
+        self.apple.randomize_position(self.snake.free_cells)
+        self.ticks = 0
+        return self.state
+
+    def step(self, action=None) -> tuple:
+        """
+        Выполняет один игровой тик по правилам main()
+        :action: Направление UP, DOWN, LEFT, RIGHT или None, чтобы применить
+        snake.next_direction. Разворот на 180 градусов игнорируется.
+        :return: (state, reward, done)
+        """
+        snake = self.snake
+        if action is not None and (
+            action[0] + snake.direction[0], action[1] + snake.direction[1]
+        ) != (0, 0):
+            snake.next_direction = action
+        snake.update_direction()
+        snake.move()
+        self.ticks += 1
+        if snake.get_head_position == self.apple.position:
+            try:
+                self.apple.randomize_position(snake.free_cells)
+            except BoardFullError:
+                # Змейка заняла всё поле — игра окончена победой. Расти
+                # некуда, поэтому длина равна размеру поля
+                return self.state, APPLE_REWARD, True
+            snake.length += 1
+            return self.state, APPLE_REWARD, False
+        if snake.collided:
+            return self.state, DEATH_REWARD, True
+        return self.state, 0, False
+
+
+def chunk_spans(start, length, size, chunk):
+    """
+    Разбивает отрезок клеток [start, start + length) на поле-торе размера
+    size на куски по чанкам размера chunk
+    :return: список (номер чанка, смещение в чанке, смещение на экране,
+    длина куска) в клетках
+    """
+    spans = []
+    position = start % size
+    offset = 0
+    while offset < length:
+        index = position // chunk
+        inner = position - index * chunk
+        span = min(chunk - inner, size - position, length - offset)
+        spans.append((index, inner, offset, span))
+        offset += span
+        position = (position + span) % size
+    return spans
+
+
+class Camera:
+    """
+    Camera — окно размером с экран на игровом поле, следящее за головой
+    змейки. Если поле помещается на экран, камера неподвижна.
+    :метод: follow — центрирует окно на клетке.
+    """
+
+    def __init__(self, board, width=GRID_WIDTH, height=GRID_HEIGHT):
+        """
+        :board:  Игровое поле.
+        :width, height:  Видимая часть поля в клетках.
+        :x, y:  Клетка поля в левом верхнем углу экрана.
+        """
+        self.board = board
+        self.width = min(width, board.width)
+        self.height = min(height, board.height)
+        self.x = 0
+        self.y = 0
+
+    def follow(self, cell):
+        """Центрирует окно камеры на клетке cell"""
+        if self.board.width > self.width:
+            self.x = (cell[0] - self.width // 2) % self.board.width
+        if self.board.height > self.height:
+            self.y = (cell[1] - self.height // 2) % self.board.height
+
+
+class ChunkRenderer:
+    """
+    ChunkRenderer рисует большое поле через камеру. Поле разбито на чанки
+    CHUNK_SIZE x CHUNK_SIZE клеток; каждый видимый чанк отрисовывается
+    в отдельную поверхность один раз и кэшируется, пока его клетки
+    не изменятся. Кадр — это blit видимых частей чанков, поэтому память
+    и время кадра зависят от размера экрана, а не поля.
+    :метод: draw — отрисовывает кадр и возвращает изменившиеся области.
+    """
+
+    def __init__(self, board, chunk_size=CHUNK_SIZE):
+        """
+        :camera:  Камера, следящая за головой змейки.
+        :chunks:  Кэш поверхностей чанков в порядке последнего использования.
+        :capacity:  Максимум чанков в кэше — вдвое больше видимых.
+        """
+        self.board = board
+        self.chunk_size = chunk_size
+        self.camera = Camera(board)
+        self.chunks = OrderedDict()
+        visible = (
+            (-(-GRID_WIDTH // chunk_size) + 1)
+            * (-(-GRID_HEIGHT // chunk_size) + 1)
+        )
+        self.capacity = 2 * visible
+        self.apple_position = None
+
+    def invalidate(self, cell):
+        """Сбрасывает кэш чанка, в котором лежит клетка cell"""
+        if cell is not None:
+            self.chunks.pop(
+                (cell[0] // self.chunk_size, cell[1] // self.chunk_size), None
+            )
+
+    def render_chunk(self, key, snake, apple):
+        """Отрисовывает чанк key в новую поверхность"""
+        size = self.chunk_size
+        left, top = key[0] * size, key[1] * size
+        surface = pg.Surface((size * GRID_SIZE, size * GRID_SIZE)).convert(
+            get_screen()
+        )
+        surface.fill(BOARD_BACKGROUND_COLOR)
+        body = get_sprite(snake.body_color)
+        blits = [
+            (body, ((x - left) * GRID_SIZE, (y - top) * GRID_SIZE))
+            for y in range(top, min(top + size, self.board.height))
+            for x in range(left, min(left + size, self.board.width))
+            if (x, y) in snake.occupied
+        ]
+        for cell, sprite in (
+            (snake.get_head_position, get_sprite(snake.head_color)),
+            (apple.position, get_sprite(apple.body_color)),
+        ):
+            if left <= cell[0] < left + size and top <= cell[1] < top + size:
+                blits.append((sprite, to_pixels(
+                    (cell[0] - left, cell[1] - top)
+                )))
+        surface.blits(blits, doreturn=False)
+        return surface
+
+    def get_chunk(self, key, snake, apple):
+        """Возвращает поверхность чанка из кэша, отрисовывая ее при промахе"""
+        surface = self.chunks.get(key)
+        if surface is None:
+            surface = self.render_chunk(key, snake, apple)
+            self.chunks[key] = surface
+            if len(self.chunks) > self.capacity:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return surface
+
+    def draw(self, snake, apple) -> list:
+        """
+        Отрисовывает видимую часть поля на экране
+        :return: список изменившихся областей экрана
+        """
+        if snake.redraw:
+            self.chunks.clear()
+            snake.redraw = False
+        for cell in islice(snake.positions, 2):
+            self.invalidate(cell)
+        self.invalidate(snake.last)
+        if apple.position != self.apple_position:
+            self.invalidate(self.apple_position)
+            self.invalidate(apple.position)
+            self.apple_position = apple.position
+        camera = self.camera
+        camera.follow(snake.get_head_position)
+        columns = chunk_spans(
+            camera.x, camera.width, self.board.width, self.chunk_size
+        )
+        rows = chunk_spans(
+            camera.y, camera.height, self.board.height, self.chunk_size
+        )
+        blits = [
+            (
+                self.get_chunk((column, row), snake, apple),
+                to_pixels((screen_x, screen_y)),
+                pg.Rect(
+                    to_pixels((inner_x, inner_y)),
+                    to_pixels((span_x, span_y)),
+                ),
+            )
+            for row, inner_y, screen_y, span_y in rows
+            for column, inner_x, screen_x, span_x in columns
+        ]
+        return get_screen().blits(blits)
 
 
 def main():
-    """В данном методе реализована логика игры.
-    Создаются и отрисовываются объекты классов Apple() и Snake().
-    Проверяется нажатие кнопок и устанавливается направление движения змейки.
-    Проверяются столкновения змейки и яблока, а также проверяется столкновение
-    змейки с самой собой.
+    """В данном методе реализован pygame-интерфейс игры.
+    Логику игры выполняет GameEngine, а main создает окно, считывает
+    нажатие кнопок и отрисовывает объекты Snake и Apple движка.
     В случае столкновения змейки с самой собой игра начинается заново.
     """
     # Инициализация pg:
     pg.init()
+    init_display()
     # Тут нужно создать экземпляры классов.
-    snake = Snake()
-    apple = Apple(snake.positions)
-    while True:
-        # Тут опишите основную логику игры.
-        clock.tick(SPEED)
-        handle_keys(snake)
-        snake.update_direction()
-        snake.move()
-        if snake.get_head_position == apple.position:
-            snake.length += 1
-            apple.randomize_position(snake.positions)
-        elif snake.get_head_position in snake.positions[1:]:
-            screen.fill(BOARD_BACKGROUND_COLOR)
-            snake.reset()
-        apple.draw()
-        snake.draw()
+    if REPLAY_PATH:
+        from snake_replay import RecordingEngine
+        engine = RecordingEngine(board=BOARD)
+    else:
+        engine = GameEngine(board=BOARD)
+    renderer = None if BOARD.fits_screen() else ChunkRenderer(BOARD)
+    pilot = None
+    if AUTOPILOT:
+        from snake_autopilot import Autopilot
+        pilot = Autopilot(BOARD, AUTOPILOT)
+    timer = FrameTimer(enabled=PROFILE_ENABLED or PROFILE_HUD)
+    try:
+        if FIXED_TIMESTEP:
+            run_fixed_timestep(engine, timer, renderer, pilot)
+        while True:
+            get_clock().tick(SPEED)
+            game_tick(engine, timer, renderer, pilot)
+    finally:
+        if PROFILE_EXPORT_PATH:
+            timer.export(PROFILE_EXPORT_PATH)
+        if REPLAY_PATH:
+            engine.save(REPLAY_PATH)
+
+
+def interpolate(start, end, alpha):
+    """Возвращает точку на доле alpha пути от клетки start к клетке end.
+    При переходе через край поля интерполяция не выполняется.
+    :return: tuple[float, float]
+    """
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    if abs(dx) > 1 or abs(dy) > 1:
+        return end
+    return (start[0] + dx * alpha, start[1] + dy * alpha)
+
+
+def wait_until(deadline):
+    """Гибридное ожидание до момента deadline (по perf_counter):
+    sleep, пока до дедлайна больше SPIN_THRESHOLD, затем активное
+    ожидание. Дает меньший разброс времени кадра, чем clock.tick.
+    """
+    remaining = deadline - perf_counter()
+    if remaining > SPIN_THRESHOLD:
+        sleep(remaining - SPIN_THRESHOLD)
+    while perf_counter() < deadline:
+        pass
+
+
+def update_game(engine, pilot=None):
+    """Выполняет один шаг логики и перезапускает игру после ее окончания.
+    :param engine: GameEngine
+    :param pilot: Autopilot, выбирающий направление вместо игрока
+    """
+    _, _, done = engine.step(pilot(engine) if pilot else None)
+    if done:
+        get_screen().fill(BOARD_BACKGROUND_COLOR)
+        engine.reset()
+
+
+def render_frame(engine, timer, alpha=None, renderer=None):
+    """Отрисовывает кадр и обновляет изменившиеся области экрана.
+    :param engine: GameEngine
+    :param timer: FrameTimer
+    :param alpha: Доля логического шага для интерполяции; None — без нее
+    :param renderer: ChunkRenderer для поля больше экрана (без интерполяции)
+    """
+    snake, apple = engine.snake, engine.apple
+    full_update = snake.redraw or not INCREMENTAL_RENDER
+    if renderer is not None:
+        dirty_rects = renderer.draw(snake, apple)
+    elif alpha is None:
+        dirty_rects = get_screen().blits(snake.draw() + apple.draw())
+    else:
+        dirty_rects = get_screen().blits(
+            snake.draw_interpolated(alpha) + apple.draw()
+        )
+    if PROFILE_HUD:
+        dirty_rects.append(timer.draw_hud(get_screen()))
+    timer.mark(DRAW)
+    if full_update:
         pg.display.update()
+    else:
+        pg.display.update(dirty_rects)
+    timer.mark(DISPLAY)
+
+
+def game_tick(engine, timer, renderer=None, pilot=None):
+    """Выполняет один тик игры: ввод, логика, отрисовка и обновление экрана.
+    Длительность каждой фазы записывается в timer.
+    :param engine: GameEngine
+    :param timer: FrameTimer
+    :param renderer: ChunkRenderer для поля больше экрана
+    :param pilot: Autopilot, выбирающий направление вместо игрока
+    """
+    timer.start_frame()
+    handle_keys(engine.snake)
+    timer.mark(INPUT)
+    update_game(engine, pilot)
+    timer.mark(LOGIC)
+    render_frame(engine, timer, renderer=renderer)
+
+
+def run_fixed_timestep(engine, timer, renderer=None, pilot=None):
+    """Игровой цикл с фиксированным шагом логики.
+    Прошедшее время копится в аккумуляторе, и логика выполняется шагами
+    по 1 / LOGIC_RATE секунды. Кадры рисуются с частотой RENDER_RATE
+    с интерполяцией змейки между клетками и гибридным ожиданием.
+    :param engine: GameEngine
+    :param timer: FrameTimer
+    :param renderer: ChunkRenderer для поля больше экрана
+    :param pilot: Autopilot, выбирающий направление вместо игрока
+    """
+    logic_step = 1 / LOGIC_RATE
+    frame_time = 1 / RENDER_RATE
+    previous = next_frame = perf_counter()
+    accumulator = 0.0
+    while True:
+        timer.start_frame()
+        handle_keys(engine.snake)
+        timer.mark(INPUT)
+        now = perf_counter()
+        accumulator += min(now - previous, MAX_FRAME_TIME)
+        previous = now
+        steps = 0
+        while accumulator >= logic_step:
+            update_game(engine, pilot)
+            accumulator -= logic_step
+            steps += 1
+        if steps > 1:
+            # Несколько шагов за кадр: промежуточные хвосты не затерты
+            get_screen().fill(BOARD_BACKGROUND_COLOR)
+            engine.snake.redraw = True
+        timer.mark(LOGIC)
+        render_frame(engine, timer, accumulator / logic_step, renderer)
+        next_frame = max(next_frame + frame_time, perf_counter())
+        wait_until(next_frame)
 
 # Функция обработки действий пользователя
 
 
 def handle_keys(game_object):
-    """Считывает нажатие конопок на клавиатуре и передает их в метод
-    next_direction объекта snake=Snake()
+    """Считывает нажатие конопок на клавиатуре и добавляет направления
+    в очередь input_queue объекта snake=Snake(), чтобы быстрые
+    последовательности нажатий не терялись
     :param game_object: snake=Snake()
     :type game_object: Snake()
     :raises SystemExit:
     """
+    keys = key_directions()
     for event in pg.event.get():
         if event.type == pg.QUIT:
             pg.quit()
             raise SystemExit
-        elif event.type == pg.KEYDOWN:
-            if event.key == pg.K_UP and game_object.direction != DOWN:
-                game_object.next_direction = UP
-            elif event.key == pg.K_DOWN and game_object.direction != UP:
-                game_object.next_direction = DOWN
-            elif event.key == pg.K_LEFT and game_object.direction != RIGHT:
-                game_object.next_direction = LEFT
-            elif event.key == pg.K_RIGHT and game_object.direction != LEFT:
-                game_object.next_direction = RIGHT
+        elif event.type == pg.KEYDOWN and event.key in keys:
+            game_object.queue_direction(keys[event.key])
 
 
 if __name__ == '__main__':